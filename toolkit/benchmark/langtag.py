@@ -0,0 +1,32 @@
+# coding:utf-8
+
+from timeit import repeat
+from typing import Sequence
+
+from xlc.database.langtags import LangTag
+
+REGION_TAGS: Sequence[str] = ("en-US", "zh-CN", "fr-FR", "de-DE", "pt-BR")
+INVALID_TAGS: Sequence[str] = ("en-QQ", "zh-XX", "fr-ZZ", "de-QM", "pt-AA")
+
+
+def parse(langtags: Sequence[str]):
+    for langtag in langtags:
+        try:
+            LangTag(langtag)
+        except KeyError:
+            pass
+
+
+def latency(title: str, langtags: Sequence[str], number: int = 2000):
+    parse(langtags)  # warm up
+    best: float = min(repeat(lambda: parse(langtags), number=number, repeat=5))  # noqa:E501
+    print(f"{title}\t{best / number / len(langtags) * 1e6:.2f} us/tag")
+
+
+def main():
+    latency("region tags ", REGION_TAGS)
+    latency("invalid tags", INVALID_TAGS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# coding:utf-8
+
+import os
+from timeit import repeat
+from typing import Sequence
+
+from xlc.language.message import Message
+
+MESSAGES: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "xlc", "xlc", "unittest", "messages")  # noqa:E501
+EXACT_TAGS: Sequence[str] = ("en", "zh-Hans", "zh-Hant", "zh-CN", "zh-TW")
+FALLBACK_TAGS: Sequence[str] = ("en-US", "zh-Hans-SG", "zh-Hant-HK", "zh-Hans-CN", "zh-Hant-MO")  # noqa:E501
+MISS_TAGS: Sequence[str] = ("zh", "zh-HK", "zh-SG", "zh-MO", "zh")
+
+
+def lookup(message: Message, langtags: Sequence[str]):
+    for langtag in langtags:
+        try:
+            message.lookup(langtag)
+        except LookupError:
+            pass
+
+
+def latency(title: str, message: Message, langtags: Sequence[str], number: int = 20000):  # noqa:E501
+    lookup(message, langtags)  # warm up
+    best: float = min(repeat(lambda: lookup(message, langtags), number=number, repeat=5))  # noqa:E501
+    print(f"{title}\t{best / number / len(langtags) * 1e6:.2f} us/tag")
+
+
+def main():
+    message: Message = Message(MESSAGES)
+    latency("exact   ", message, EXACT_TAGS)
+    latency("fallback", message, FALLBACK_TAGS)
+    latency("miss    ", message, MISS_TAGS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# coding:utf-8
+
+from argparse import ArgumentParser
+import json
+import os
+import platform
+from statistics import median
+from subprocess import run
+import sys
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Sequence
+from typing import Tuple
+
+BASE: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "xlc")  # noqa:E501
+PROBE: str = """
+import os
+import resource
+page = os.sysconf("SC_PAGE_SIZE") // 1024
+def rss():
+    try:
+        with open("/proc/self/statm") as rhdl:
+            return int(rhdl.read().split()[1]) * page
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+before = rss()
+{code}
+print(rss() - before)
+"""
+
+
+class Scenario(NamedTuple):
+    name: str
+    code: str
+    budget_ms: float  # import time
+    budget_kb: int  # resident set size growth
+
+
+SCENARIOS: Sequence[Scenario] = (
+    Scenario("import xlc", "import xlc", 60.0, 4096),
+    Scenario("LangTag", "from xlc import LangTag; LangTag('zh-Hans-CN')", 100.0, 8192),  # noqa:E501
+    Scenario("Message", "from xlc import Message", 200.0, 16384),
+)
+
+
+def measure(code: str) -> Tuple[float, int]:
+    """Import time (ms, xlc and what it pulls in) and RSS growth (KB)"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (BASE, os.environ.get("PYTHONPATH")))))  # noqa:E501
+    result = run([sys.executable, "-X", "importtime", "-c", PROBE.format(code=code)],  # noqa:E501
+                 capture_output=True, check=True, text=True, env=env)
+    micros: int = 0
+    started: bool = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        started = started or name.strip().startswith("xlc")
+        if started and not name[1:].startswith(" "):  # top level imports
+            micros += int(cumulative)
+    return micros / 1000, int(result.stdout.strip())
+
+
+def main():
+    parser = ArgumentParser(description="xlc startup cost")
+    parser.add_argument("--repeat", type=int, default=7,
+                        help="runs per scenario, the median is reported")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply budgets, e.g. for slow machines")
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument("--baseline",
+                        help="budget relative to results JSON file instead")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed growth to baseline, 0.5 means 50%%")
+    args = parser.parse_args()
+    baseline: Dict[str, Dict[str, float]] = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as rhdl:
+            baseline = json.load(rhdl)["results"]
+    results: Dict[str, Dict[str, float]] = {}
+    failures: List[str] = []
+    print("scenario  \timport (ms)\tbudget\tRSS (KB)\tbudget")
+    for scenario in SCENARIOS:
+        runs = [measure(scenario.code) for _ in range(args.repeat)]
+        millis: float = median(run[0] for run in runs)
+        rss: float = median(run[1] for run in runs)
+        results[scenario.name] = {"ms": millis, "kb": rss}
+        budget_ms: float = scenario.budget_ms * args.scale
+        budget_kb: float = scenario.budget_kb * args.scale
+        if scenario.name in baseline:
+            budget_ms = baseline[scenario.name]["ms"] * (1.0 + args.tolerance)  # noqa:E501
+            budget_kb = baseline[scenario.name]["kb"] * (1.0 + args.tolerance)  # noqa:E501
+        print(f"{scenario.name:10}\t{millis:.2f}\t\t{budget_ms:.0f}\t{rss:.0f}\t\t{budget_kb:.0f}")  # noqa:E501
+        if millis > budget_ms or rss > budget_kb:
+            failures.append(scenario.name)
+    if args.output:
+        report: Dict[str, Any] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,  # median import ms and RSS KB
+        }
+        with open(args.output, "w", encoding="utf-8") as whdl:
+            json.dump(report, whdl, indent=2)
+    if failures:
+        print(f"over budget: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
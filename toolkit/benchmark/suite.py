@@ -0,0 +1,148 @@
+# coding:utf-8
+
+from argparse import ArgumentParser
+import json
+from math import ceil
+import os
+import platform
+import sys
+from tempfile import TemporaryDirectory
+from timeit import Timer
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from xlc.database.langtags import LangTag
+from xlc.database.langtags import LangTags
+from xlc.language.message import Message
+from xlc.language.segment import Segment
+
+LANGTAGS: Tuple[str, ...] = ("en-US", "zh-Hans-CN", "zh-hant-tw", "ZH_hans_sg", "en")  # noqa:E501
+
+
+def sections(keys: int, depth: int, width: int) -> List[str]:
+    """Dotted section paths of depth levels holding width keys each"""
+    leaves: int = max(1, ceil(keys / width))
+    fanout: int = max(2, ceil(leaves ** (1 / depth)))
+    paths: List[str] = []
+    for leaf in range(leaves):
+        names: List[str] = []
+        for _ in range(depth):
+            leaf, index = divmod(leaf, fanout)
+            names.append(f"section{index}")
+        paths.append(".".join(reversed(names)))
+    return paths
+
+
+def synthesize(base: str, locales: int, keys: int, depth: int, width: int) -> List[str]:  # noqa:E501
+    """Write catalogs of keys values for the first locales language tags"""
+    langtags: LangTags = LangTags.shared()
+    paths: List[str] = sections(keys, depth, width)
+    names: List[str] = list(langtags)[:locales]
+    for name in names:
+        segment: Segment = Segment(langtags[name])
+        for i in range(keys):
+            segment.seek(paths[i // width]).set(f"key{i}", f"{name} message {i} for {{user}} at {{time}}")  # noqa:E501
+        segment.dumpf(os.path.join(base, name + Message.SUFFIX))
+    return names
+
+
+def measure(function: Callable[[], Any], operations: int, seconds: float) -> float:  # noqa:E501
+    """Best nanoseconds per operation over five runs of about seconds"""
+    timer: Timer = Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * seconds / 0.2))
+    best: float = min(timer.repeat(repeat=5, number=number))
+    return best / number / operations * 1e9
+
+
+def run(base: str, names: List[str], keys: int, depth: int, width: int, seconds: float) -> Dict[str, float]:  # noqa:E501
+    langtags: LangTags = LangTags.shared()
+    message: Message = Message(base)
+    path: str = os.path.join(base, names[0] + Message.SUFFIX)
+    segment: Segment = Segment.loadf(path)
+    deepest: str = sections(keys, depth, width)[-1]
+    section = segment.seek(deepest)
+
+    def parse():
+        for langtag in LANGTAGS:
+            LangTag(langtag)
+
+    def lookup():
+        for langtag in LANGTAGS:
+            langtags.lookup(langtag)
+
+    def resolve():
+        for langtag in names:
+            message.lookup(langtag)
+
+    benchmarks: Dict[str, Tuple[Callable[[], Any], int]] = {
+        "LangTag": (parse, len(LANGTAGS)),
+        "LangTags.lookup": (lookup, len(LANGTAGS)),
+        "Message.lookup": (resolve, len(names)),
+        "Segment.loadf": (lambda: Segment.loadf(path), 1),
+        "Section.seek": (lambda: segment.seek(deepest), 1),
+        "Context.fill": (lambda: section.fill(user="xlc", time="now"), 1),
+        "Segment.dumps": (segment.dumps, 1),
+    }
+    return {name: measure(function, operations, seconds)
+            for name, (function, operations) in benchmarks.items()}
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:  # noqa:E501
+    """Print ratios to baseline and return the regressed benchmarks"""
+    regressions: List[str] = []
+    print("benchmark       \tns/op\t\tbaseline\tratio")
+    for name, value in results.items():
+        base: float = baseline.get(name, 0.0)
+        ratio: float = value / base if base else 0.0
+        flag: str = ""
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+            flag = "\tREGRESSION"
+        print(f"{name:16}\t{value:10.0f}\t{base:10.0f}\t{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(description="xlc benchmark suite")
+    parser.add_argument("--locales", type=int, default=5,
+                        help="synthetic catalogs, at most one per known tag")
+    parser.add_argument("--keys", type=int, default=1000,
+                        help="keys per synthetic catalog")
+    parser.add_argument("--depth", type=int, default=3,
+                        help="nesting depth of sections")
+    parser.add_argument("--width", type=int, default=50,
+                        help="keys per section")
+    parser.add_argument("--seconds", type=float, default=0.2,
+                        help="approximate duration of each timing run")
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument("--baseline", help="compare with results JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown to baseline, 0.2 means 20%%")
+    args = parser.parse_args()
+    with TemporaryDirectory() as base:
+        names: List[str] = synthesize(base, args.locales, args.keys, args.depth, args.width)  # noqa:E501
+        results: Dict[str, float] = run(base, names, args.keys, args.depth, args.width, args.seconds)  # noqa:E501
+    report: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"locales": len(names), "keys": args.keys,
+                       "depth": args.depth, "width": args.width},
+        "results": results,  # nanoseconds per operation
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as whdl:
+            json.dump(report, whdl, indent=2)
+    baseline: Dict[str, float] = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as rhdl:
+            baseline = json.load(rhdl)["results"]
+    if compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# coding:utf-8
+
+from argparse import ArgumentParser
+import os
+import sys
+import tracemalloc
+from typing import Any
+from typing import Dict
+
+# this script lives next to xlc.py, do not let it shadow the xlc package
+if os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):  # noqa:E501
+    sys.path.pop(0)
+
+
+def nested(keys: int, depth: int, width: int, templates: int) -> Dict[str, Any]:  # noqa:E501
+    """Catalog data of keys values, width per section, depth levels deep"""
+    datas: Dict[str, Any] = {}
+    for i in range(keys):
+        section: Dict[str, Any] = datas
+        leaf: int = i // width
+        for level in range(depth):
+            section = section.setdefault(f"section{leaf // width ** (depth - level - 1) % width}", {})  # noqa:E501
+        if templates and i % templates == 0:
+            section[f"key{i}"] = f"message {i} for {{user}}"
+        else:
+            section[f"key{i}"] = f"message {i}"
+    return datas
+
+
+def main():
+    parser = ArgumentParser(description="xlc memory usage per catalog key")
+    parser.add_argument("--keys", type=int, default=100000)
+    parser.add_argument("--depth", type=int, default=3,
+                        help="nesting depth of sections")
+    parser.add_argument("--width", type=int, default=10,
+                        help="keys per section and sections per parent")
+    parser.add_argument("--templates", type=int, default=10,
+                        help="one value in N has a placeholder, 0 for none")
+    args = parser.parse_args()
+
+    from xlc.database.langtags import LangTag
+    from xlc.database.langtags import LangTags
+    from xlc.language.segment import Segment
+
+    datas: Dict[str, Any] = nested(args.keys, args.depth, args.width, args.templates)  # noqa:E501
+    lang = LangTags.shared()["en"]
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    segment: Segment = Segment.load(lang, datas)
+    segment_bytes: int = tracemalloc.get_traced_memory()[0] - before
+    before = tracemalloc.get_traced_memory()[0]
+    langtags = [LangTag(name) for name in ("zh-Hans-CN", "zh-Hant-TW", "en-US") for _ in range(1000)]  # noqa:E501
+    langtag_bytes: int = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert segment and langtags
+    print(f"Segment\t{args.keys} keys\t{segment_bytes / 1048576:.2f} MB\t{segment_bytes / args.keys:.1f} bytes/key")  # noqa:E501
+    print(f"LangTag\t{len(langtags)} tags\t{langtag_bytes / 1048576:.2f} MB\t{langtag_bytes / len(langtags):.1f} bytes/tag")  # noqa:E501
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,89 @@
 # coding:utf-8
 
+from argparse import ArgumentParser
+from multiprocessing import get_context
 import os
+import sys
+from tempfile import TemporaryDirectory
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
 
 from psutil import Process
 
+# this script is named xlc.py, do not let it shadow the xlc package
+if os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):  # noqa:E501
+    sys.path.pop(0)
 
-def memory_info(process: Process):
-    memory_info = process.memory_info()
-    print(f"VMS (Virtual Memory Size)\t{memory_info.vms / 1024 / 1024:.2f} MB\t{memory_info.vms}")  # noqa:E501
-    print(f"RSS (Resident Set Size)  \t{memory_info.rss / 1024 / 1024:.2f} MB\t{memory_info.rss}")  # noqa:E501
+
+def synthesize(base: str, keys: int) -> List[str]:
+    """Write one catalog with keys values for every known language tag"""
+    from xlc.database.langtags import LangTags
+    from xlc.language.message import Message
+    from xlc.language.segment import Segment
+
+    langtags = LangTags.shared()
+    for name in langtags:
+        datas: Dict[str, Any] = {}
+        for i in range(keys):
+            section: Dict[str, Any] = datas.setdefault(f"section{i // 100}", {})  # noqa:E501
+            section[f"key{i}"] = f"{name} message {i} with {{placeholder}} and some padding text"  # noqa:E501
+        segment = Segment.load(langtags[name], datas)
+        path: str = os.path.join(base, name + Message.SUFFIX)
+        segment.dumpf(path)
+        segment.dumpc(Message.compiled(path))
+    return list(langtags)
+
+
+def worker(base: str, tags: List[str], mapped: bool, barrier: Any, queue: Any):  # noqa:E501
+    from xlc.language.message import Message
+
+    message = Message(base, mapped=mapped)
+    for tag in tags:
+        for value in message.catalog(tag).values():
+            assert value
+    info = Process(os.getpid()).memory_full_info()
+    queue.put((info.rss, info.pss, info.uss))
+    barrier.wait()  # keep every worker alive until all are measured
+
+
+def workers_memory(base: str, tags: List[str], count: int, mapped: bool) -> Tuple[int, int, int]:  # noqa:E501
+    context = get_context("fork")
+    barrier = context.Barrier(count + 1)
+    queue = context.Queue()
+    processes = [context.Process(target=worker, args=(base, tags, mapped, barrier, queue))  # noqa:E501
+                 for _ in range(count)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    barrier.wait()
+    for process in processes:
+        process.join()
+    rss, pss, uss = (sum(result[i] for result in results) for i in range(3))
+    return rss, pss, uss
+
+
+def compare_workers(count: int, keys: int):
+    import xlc  # noqa:F401  # import before forking, as pre-forked servers do
+
+    with TemporaryDirectory() as base:
+        tags: List[str] = synthesize(base, keys)
+        print(f"{count} workers, {len(tags)} catalogs x {keys} keys")
+        print("backend \tRSS (MB)\tPSS (MB)\tUSS (MB)")
+        for name, mapped in (("classic", False), ("mmap", True)):
+            rss, pss, uss = workers_memory(base, tags, count, mapped)
+            print(f"{name}  \t{rss / 1048576:.2f}  \t{pss / 1048576:.2f}  \t{uss / 1048576:.2f}")  # noqa:E501
 
 
 def main():
-    pid: int = os.getpid()
-    print(f"Hello, PID {pid}")
-    process: Process = Process(pid)
-    print("Before import:")
-    memory_info(process)
-    import xlc  # noqa:F401
-    print("After import:")
-    memory_info(process)
-    print("Goodbye!")
+    parser = ArgumentParser(description="xlc memory usage of forked workers, see benchmark/startup.py for the cost of import")  # noqa:E501
+    parser.add_argument("--workers", type=int, default=4,
+                        help="compare classic and mmap backends with N forked workers")  # noqa:E501
+    parser.add_argument("--keys", type=int, default=5000,
+                        help="keys per synthetic catalog")
+    args = parser.parse_args()
+    compare_workers(args.workers, args.keys)
 
 
 if __name__ == "__main__":
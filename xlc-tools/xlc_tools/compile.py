@@ -0,0 +1,41 @@
+# coding:utf-8
+
+import os
+from typing import Optional
+from typing import Sequence
+
+from xkits_command import ArgParser
+from xkits_command import Command
+from xkits_command import CommandArgument
+from xkits_command import CommandExecutor
+
+from xlc.attribute import __project_home__
+from xlc.attribute import __version__
+from xlc.language.message import Message
+from xlc.language.segment import Segment
+
+
+@CommandArgument("xlc-compile", description="Compile xlc files into xlcc files")  # noqa:E501
+def add_cmd(_arg: ArgParser):
+    _arg.add_argument("--base", dest="directory", type=str, help="directory",
+                      metavar="DIR", default="translate")
+    _arg.add_argument("--force", dest="force", action="store_true",
+                      help="compile even if the xlcc file is up to date")
+
+
+@CommandExecutor(add_cmd)
+def run_cmd(cmds: Command) -> int:
+    directory: str = cmds.args.directory
+    force: bool = cmds.args.force
+    for path in Message(directory).scan():
+        if force or not Message.fresh(path):
+            compiled: str = Message.compiled(path)
+            Segment.loadf(path).dumpc(compiled)
+            cmds.logger.info(f"{os.path.basename(path)} -> {os.path.basename(compiled)}")  # noqa:E501
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    cmds = Command()
+    cmds.version = __version__
+    return cmds.run(root=add_cmd, argv=argv, epilog=f"For more, please visit {__project_home__}.")  # noqa:E501
@@ -10,7 +10,7 @@ from xkits_command import Command
 from xkits_command import CommandArgument
 from xkits_command import CommandExecutor
 
-from xlc.attribute import __urlhome__
+from xlc.attribute import __project_home__
 from xlc.attribute import __version__
 from xlc.database.langtags import LangTag
 from xlc.language.message import Message
@@ -35,11 +35,12 @@ def run_cmd(cmds: Command) -> int:
         ltag: LangTag = message.languages.get(language)
         segment: Segment = message.load(ltag) if ltag in message else Segment.generate(ltag)  # noqa:E501
         filename: str = segment.lang.name + Message.SUFFIX
-        segment.dumpf(os.path.join(directory, filename))
+        if segment.dumpf(os.path.join(directory, filename)):
+            cmds.logger.info(f"{filename} updated")
     return 0
 
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
     cmds = Command()
     cmds.version = __version__
-    return cmds.run(root=add_cmd, argv=argv, epilog=f"For more, please visit {__urlhome__}.")  # noqa:E501
+    return cmds.run(root=add_cmd, argv=argv, epilog=f"For more, please visit {__project_home__}.")  # noqa:E501
@@ -0,0 +1,48 @@
+# coding:utf-8
+
+import json
+from typing import Optional
+from typing import Sequence
+
+from xkits_command import ArgParser
+from xkits_command import Command
+from xkits_command import CommandArgument
+from xkits_command import CommandExecutor
+
+from xlc.attribute import __project_home__
+from xlc.attribute import __version__
+from xlc.language.message import Message
+from xlc.language.report import Report
+
+
+@CommandArgument("xlc-report", description="Report missing keys and placeholder mismatches of xlc files")  # noqa:E501
+def add_cmd(_arg: ArgParser):
+    _arg.add_argument("--base", dest="directory", type=str, help="directory",
+                      metavar="DIR", default="translate")
+    _arg.add_argument("--reference", dest="reference", type=str,
+                      help="reference language", metavar="LANG", default="en")
+    _arg.add_argument("--format", dest="format", type=str, default="text",
+                      choices=["text", "json"],
+                      help="text lines or one JSON object per language")
+    _arg.add_argument(dest="languages", type=str, help="language", nargs="*",
+                      metavar="LANG", default=[])
+
+
+@CommandExecutor(add_cmd)
+def run_cmd(cmds: Command) -> int:
+    report: Report = Report(Message(cmds.args.directory), cmds.args.reference)  # noqa:E501
+    passed: bool = True
+    for locale in report.locales(cmds.args.languages or None):
+        if cmds.args.format == "json":
+            cmds.stdout(json.dumps(locale.dump(), ensure_ascii=False))
+        else:
+            for line in Report.text(locale):
+                (cmds.stdout if locale.passed else cmds.stdout_red)(line)
+        passed = passed and locale.passed
+    return 0 if passed else 1
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    cmds = Command()
+    cmds.version = __version__
+    return cmds.run(root=add_cmd, argv=argv, epilog=f"For more, please visit {__project_home__}.")  # noqa:E501
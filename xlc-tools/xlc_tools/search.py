@@ -0,0 +1,38 @@
+# coding:utf-8
+
+from typing import Optional
+from typing import Sequence
+
+from xkits_command import ArgParser
+from xkits_command import Command
+from xkits_command import CommandArgument
+from xkits_command import CommandExecutor
+
+from xlc.attribute import __project_home__
+from xlc.attribute import __version__
+from xlc.language.message import Message
+from xlc.language.search import SearchIndex
+
+
+@CommandArgument("xlc-search", description="Search keys of xlc files by value")  # noqa:E501
+def add_cmd(_arg: ArgParser):
+    _arg.add_argument("--base", dest="directory", type=str, help="directory",
+                      metavar="DIR", default="translate")
+    _arg.add_argument("--lang", dest="languages", type=str, help="language",
+                      action="append", metavar="LANG", default=[])
+    _arg.add_argument(dest="text", type=str, help="case-insensitive substring",
+                      metavar="TEXT")
+
+
+@CommandExecutor(add_cmd)
+def run_cmd(cmds: Command) -> int:
+    index: SearchIndex = SearchIndex(Message(cmds.args.directory))
+    for language, key in index.search(cmds.args.text, cmds.args.languages or None):  # noqa:E501
+        cmds.stdout(f"{language}\t{key}")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    cmds = Command()
+    cmds.version = __version__
+    return cmds.run(root=add_cmd, argv=argv, epilog=f"For more, please visit {__project_home__}.")  # noqa:E501
@@ -0,0 +1,108 @@
+# coding:utf-8
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+import os
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from xkits_command import ArgParser
+from xkits_command import Command
+from xkits_command import CommandArgument
+from xkits_command import CommandExecutor
+
+from xlc.attribute import __project_home__
+from xlc.attribute import __version__
+from xlc.language.message import Message
+from xlc.language.segment import Segment
+
+KeyPath = Tuple[str, ...]
+REFERENCE: Dict[KeyPath, Any] = {}  # key paths of the worker's reference
+
+
+def flatten(path: str) -> Dict[KeyPath, Any]:
+    """Key paths to values, without the per section language"""
+    return {k: v for k, v in Message.entries(path).items()
+            if k[-1] != "language"}
+
+
+def nested(datas: Dict[KeyPath, Any]) -> Dict[str, Any]:
+    """Tables of key paths, ValueError if a path is both value and table"""
+    result: Dict[str, Any] = {}
+    for key, value in datas.items():
+        *sections, index = key
+        table: Dict[str, Any] = result
+        for depth, section in enumerate(sections, start=1):
+            table = table.setdefault(section, {})
+            if not isinstance(table, dict):
+                raise ValueError(f"{'.'.join(key[:depth])!r} is a value and a table")  # noqa:E501
+        if isinstance(table.get(index), dict):
+            raise ValueError(f"{'.'.join(key)!r} is a value and a table")
+        table[index] = value
+    return result
+
+
+def initialize(reference: Dict[KeyPath, Any]):
+    REFERENCE.update(reference)
+
+
+def synchronize(path: str, prune: bool) -> Tuple[int, int, bool]:
+    """Insert missing keys with the reference values, optionally remove
+    obsolete ones, return the numbers of both and whether it is written"""
+    target: Dict[KeyPath, Any] = flatten(path)
+    missing: int = sum(1 for key in REFERENCE if key not in target)
+    obsolete: List[KeyPath] = [key for key in target if key not in REFERENCE]
+    if not missing and not (prune and obsolete):
+        return 0, len(obsolete), False
+    datas: Dict[KeyPath, Any] = {key: target.get(key, value) for key, value in REFERENCE.items()}  # noqa:E501
+    if not prune:
+        datas.update((key, target[key]) for key in obsolete)
+    segment: Segment = Segment.load(Segment.filelang(path), nested(datas))
+    return missing, len(obsolete), segment.dumpf(path)
+
+
+@CommandArgument("xlc-sync", description="Synchronize xlc files with a reference language")  # noqa:E501
+def add_cmd(_arg: ArgParser):
+    _arg.add_argument("--base", dest="directory", type=str, help="directory",
+                      metavar="DIR", default="translate")
+    _arg.add_argument("--reference", dest="reference", type=str,
+                      help="reference language", metavar="LANG", default="en")
+    _arg.add_argument("--prune", dest="prune", action="store_true",
+                      help="remove keys that are not in the reference")
+    _arg.add_argument("--workers", dest="workers", type=int, default=None,
+                      help="worker processes, default to the CPU count")
+    _arg.add_argument(dest="languages", type=str, help="language", nargs="*",
+                      metavar="LANG", default=[])
+
+
+@CommandExecutor(add_cmd)
+def run_cmd(cmds: Command) -> int:
+    message: Message = Message(cmds.args.directory)
+    source: str = message.path(cmds.args.reference)
+    paths: List[str] = sorted({message.path(language) for language in cmds.args.languages} if cmds.args.languages else message.scan())  # noqa:E501
+    paths = [path for path in paths if path != source]
+    with ProcessPoolExecutor(max_workers=cmds.args.workers, initializer=initialize,  # noqa:E501
+                             initargs=(flatten(source),)) as pool:
+        futures = {pool.submit(synchronize, path, cmds.args.prune): path for path in paths}  # noqa:E501
+        failed: int = 0
+        for future in as_completed(futures):
+            filename: str = os.path.basename(futures[future])
+            try:
+                missing, obsolete, written = future.result()
+            except (KeyError, ValueError) as error:
+                cmds.logger.error(f"{filename}: {error}")
+                failed += 1
+                continue
+            if written:
+                cmds.logger.info(f"{filename}: {missing} added, {obsolete if cmds.args.prune else 0} removed")  # noqa:E501
+    return 1 if failed else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    cmds = Command()
+    cmds.version = __version__
+    return cmds.run(root=add_cmd, argv=argv, epilog=f"For more, please visit {__project_home__}.")  # noqa:E501
@@ -0,0 +1,104 @@
+# coding:utf-8
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest import main
+
+from xlc.language.message import Message
+from xlc.language.search import SearchIndex
+from xlc.language.segment import Segment
+
+from xlc_tools import compile as xlc_compile
+from xlc_tools import generate as xlc_generate
+from xlc_tools import report as xlc_report
+from xlc_tools import search as xlc_search
+from xlc_tools import sync as xlc_sync
+
+
+class TestTools(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.base: str = self.tempdir.name
+        self.write("en.xlc", "[login]\nusername = \"Username\"\nwelcome = \"Hi {name}\"\n")  # noqa:E501
+        self.write("zh-Hans.xlc", "[login]\nusername = \"用户\"\nobsolete = \"过时\"\n")  # noqa:E501
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def write(self, filename: str, data: str):
+        with open(os.path.join(self.base, filename), "w", encoding="utf-8") as whdl:  # noqa:E501
+            whdl.write(data)
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.base, filename)
+
+    def test_generate(self):
+        self.assertEqual(xlc_generate.main(["--base", self.base, "en", "zh-Hant"]), 0)  # noqa:E501
+        self.assertTrue(os.path.isfile(self.path("zh-Hant.xlc")))
+        self.assertEqual(Segment.loadf(self.path("en.xlc")).seek("login").get("username"), "Username")  # noqa:E501
+
+    def test_compile(self):
+        self.assertEqual(xlc_compile.main(["--base", self.base]), 0)
+        self.assertTrue(Message.fresh(self.path("en.xlc")))
+        self.assertEqual(xlc_compile.main(["--base", self.base, "--force"]), 0)  # noqa:E501
+
+    def test_sync(self):
+        self.assertEqual(xlc_sync.main(["--base", self.base, "--reference", "en-US", "--workers", "1", "zh-Hans-CN", "en"]), 0)  # noqa:E501
+        values = Message.values(self.path("zh-Hans.xlc"))
+        self.assertEqual(values["login.welcome"], "Hi {name}")
+        self.assertEqual(values["login.obsolete"], "过时")
+        self.assertEqual(xlc_sync.main(["--base", self.base, "--reference", "en", "--prune", "--workers", "1"]), 0)  # noqa:E501
+        self.assertNotIn("login.obsolete", Message.values(self.path("zh-Hans.xlc")))  # noqa:E501
+        self.assertEqual(xlc_sync.main(["--base", self.base, "--workers", "1"]), 0)  # noqa:E501
+
+    def test_synchronize(self):
+        xlc_sync.initialize(xlc_sync.flatten(self.path("en.xlc")))
+        try:
+            path: str = self.path("zh-Hans.xlc")
+            self.assertEqual(xlc_sync.synchronize(path, False), (1, 1, True))
+            self.assertEqual(xlc_sync.synchronize(path, False), (0, 1, False))
+            self.assertEqual(xlc_sync.synchronize(path, True), (0, 1, True))
+            self.assertEqual(Message.values(path), {"language": "zh-Hans", "login.language": "zh-Hans", "login.username": "用户", "login.welcome": "Hi {name}"})  # noqa:E501
+        finally:
+            xlc_sync.REFERENCE.clear()
+
+    def test_sync_dotted(self):
+        self.write("zh-Hans.xlc", "[login]\n\"user.name\" = \"点\"\nusername = \"用户\"\n")  # noqa:E501
+        self.assertEqual(xlc_sync.main(["--base", self.base, "--workers", "1", "zh-Hans"]), 0)  # noqa:E501
+        segment: Segment = Segment.loadf(self.path("zh-Hans.xlc"))
+        self.assertEqual(segment.seek("login").get("user.name"), "点")
+        self.assertEqual(segment.seek("login").get("welcome"), "Hi {name}")
+        self.assertFalse(segment.exists("login.user"))
+
+    def test_sync_conflict(self):
+        self.write("zh-Hans.xlc", "login = \"用户\"\n")
+        self.write("zh-Hant.xlc", "[login.username]\nshort = \"用戶\"\n")
+        self.assertEqual(xlc_sync.main(["--base", self.base, "--workers", "1"]), 1)  # noqa:E501
+        self.assertEqual(Message.values(self.path("zh-Hans.xlc")), {"login": "用户"})  # noqa:E501
+        self.assertRaises(ValueError, xlc_sync.nested, {("a",): 1, ("a", "b"): 2})  # noqa:E501
+        self.assertRaises(ValueError, xlc_sync.nested, {("a", "b"): 2, ("a",): 1})  # noqa:E501
+
+    def test_report(self):
+        self.assertEqual(xlc_report.main(["--base", self.base]), 1)
+        self.assertEqual(xlc_report.main(["--base", self.base, "--format", "json", "zh-Hans"]), 1)  # noqa:E501
+        self.write("zh-Hans.xlc", "[login]\nusername = \"用户\"\nwelcome = \"你好 {name}\"\n")  # noqa:E501
+        self.assertEqual(xlc_report.main(["--base", self.base]), 0)
+
+    def test_search(self):
+        self.assertEqual(xlc_search.main(["--base", self.base, "user"]), 0)
+        self.assertEqual(xlc_search.main(["--base", self.base, "--lang", "zh-Hans", "用户"]), 0)  # noqa:E501
+        self.assertTrue(SearchIndex.fresh(self.path("en.xlc")))
+
+
+if __name__ == "__main__":
+    main()
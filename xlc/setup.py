@@ -1,13 +1,11 @@
 # coding=utf-8
 
 import os
-import tarfile
 from urllib.parse import urljoin
 import sys
 
 from setuptools import find_packages
 from setuptools import setup
-from setuptools.command.install import install
 
 sys.path.append(os.path.dirname(__file__))
 
@@ -30,29 +28,7 @@ def all_requirements():
     return requirements
 
 
-class CustomInstallCommand(install):
-    """Customized setuptools install command"""
-
-    def run(self):
-        install.run(self)  # Run the standard installation
-        self.unpack_tar_files()  # Unpack all .tar files after installation
-
-    def unpack_tar_files(self):
-        install_lib = self.install_lib
-        assert isinstance(install_lib, str)
-        package_dir = os.path.join(install_lib, "xlc", "database")
-        for filename in os.listdir(package_dir):
-            if filename.endswith(".tar.xz"):
-                tar_path = os.path.join(package_dir, filename)
-                with tarfile.open(tar_path, "r:xz") as tar:
-                    tar.extractall(path=tar_path[:-7])
-                os.remove(tar_path)
-
-
 setup(
     version=__version__, # noqa:E501
     install_requires=all_requirements(),
-    cmdclass={
-        "install": CustomInstallCommand,
-    }
 )
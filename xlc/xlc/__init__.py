@@ -1,12 +1,54 @@
 # coding:utf-8
 
-from xlc.database import LangDict  # noqa:F401
-from xlc.database import LangItem  # noqa:F401
-from xlc.database import LangMark  # noqa:F401
-from xlc.database import LangMarks  # noqa:F401
-from xlc.database import LangT  # noqa:F401
-from xlc.database import LangTag  # noqa:F401
-from xlc.database import LangTags  # noqa:F401
-from xlc.language import Message  # noqa:F401
-from xlc.language import Section  # noqa:F401
-from xlc.language import Segment  # noqa:F401
+from typing import Dict
+from typing import TYPE_CHECKING
+
+from xlc.lazy import attach
+
+if TYPE_CHECKING:
+    from xlc.database import LangDict  # noqa:F401
+    from xlc.database import LangItem  # noqa:F401
+    from xlc.database import LangMark  # noqa:F401
+    from xlc.database import LangMarks  # noqa:F401
+    from xlc.database import LangT  # noqa:F401
+    from xlc.database import LangTag  # noqa:F401
+    from xlc.database import LangTags  # noqa:F401
+    from xlc.language import Catalog  # noqa:F401
+    from xlc.language import CompiledCatalog  # noqa:F401
+    from xlc.language import LocaleReport  # noqa:F401
+    from xlc.language import Message  # noqa:F401
+    from xlc.language import Report  # noqa:F401
+    from xlc.language import SearchIndex  # noqa:F401
+    from xlc.language import Section  # noqa:F401
+    from xlc.language import Segment  # noqa:F401
+    from xlc.language import Template  # noqa:F401
+    from xlc.observer import Collector  # noqa:F401
+    from xlc.observer import Observer  # noqa:F401
+    from xlc.observer import Observers  # noqa:F401
+
+# attributes are imported on first access (PEP 562)
+LAZY: Dict[str, str] = {
+    "LangDict": "xlc.database.langtags",
+    "LangItem": "xlc.database.langtags",
+    "LangMark": "xlc.database.langtags",
+    "LangMarks": "xlc.database.langtags",
+    "LangT": "xlc.database.langtags",
+    "LangTag": "xlc.database.langtags",
+    "LangTags": "xlc.database.langtags",
+    "Catalog": "xlc.language.catalog",
+    "CompiledCatalog": "xlc.language.catalog",
+    "Message": "xlc.language.message",
+    "LocaleReport": "xlc.language.report",
+    "Report": "xlc.language.report",
+    "SearchIndex": "xlc.language.search",
+    "Section": "xlc.language.segment",
+    "Segment": "xlc.language.segment",
+    "Template": "xlc.language.template",
+    "Collector": "xlc.observer",
+    "Observer": "xlc.observer",
+    "Observers": "xlc.observer",
+}
+
+__all__ = list(LAZY)
+
+__getattr__, __dir__ = attach(__name__, LAZY)
@@ -0,0 +1,78 @@
+# coding:utf-8
+
+import os
+from typing import BinaryIO
+from typing import Optional
+
+
+class AtomicFile():
+    """Binary file written next to the target and renamed over it
+
+    Readers, including ones that mapped the old file, see either the old
+    or the new content and never a partial one. The data is synced before
+    the rename and the directory after it, so that a power loss does not
+    leave a truncated file either. Nothing is replaced if the block raises
+    or discard() is called.
+
+    The new file keeps the permissions of the replaced one, a file that
+    did not exist gets the default permissions of the umask.
+    """
+    MODE: int = 0o666  # before the umask, like open()
+
+    def __init__(self, path: str):
+        self.__path: str = path
+        self.__temp: str = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.urandom(4).hex()}.tmp")  # noqa:E501
+        self.__file: Optional[BinaryIO] = None
+        self.__discarded: bool = False
+
+    def __enter__(self) -> "AtomicFile":
+        fd: int = os.open(self.__temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), self.MODE)  # noqa:E501
+        self.__file = os.fdopen(fd, "wb")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        file: BinaryIO = self.__file  # type:ignore
+        self.__file = None
+        if exc_type is not None or self.__discarded:
+            file.close()
+            os.remove(self.__temp)
+            return
+        try:
+            with file:
+                file.flush()
+                os.fsync(file.fileno())  # the data reaches disk before rename
+            try:
+                os.chmod(self.__temp, os.stat(self.__path).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            os.replace(self.__temp, self.__path)
+        except BaseException:
+            os.remove(self.__temp)
+            raise
+        self.fsync(os.path.dirname(self.__path) or os.curdir)
+
+    @classmethod
+    def fsync(cls, directory: str) -> None:
+        """Flush the directory entry, i.e. the rename, to disk"""
+        if os.name == "nt":  # pragma: no cover
+            return  # directories cannot be opened, NTFS journals renames
+        fd: int = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def write(self, data: bytes) -> None:
+        self.__file.write(data)  # type:ignore
+
+    @property
+    def discarded(self) -> bool:
+        return self.__discarded
+
+    def discard(self) -> None:
+        """Keep the target as it is"""
+        self.__discarded = True
@@ -0,0 +1,133 @@
+# coding:utf-8
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict
+from typing import Generic
+from typing import Iterator
+from typing import Optional
+from typing import TypeVar
+
+CK = TypeVar("CK")
+CV = TypeVar("CV")
+
+
+class LRUCache(Generic[CK, CV]):
+    """Thread-safe least recently used cache
+
+    Entries are evicted when there are more than maxsize of them or their
+    total weight exceeds maxweight, each bound is disabled if it is None.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, maxweight: Optional[int] = None):  # noqa:E501
+        self.__datas: "OrderedDict[CK, CV]" = OrderedDict()
+        self.__weights: Dict[CK, int] = {}
+        self.__maxweight: Optional[int] = maxweight
+        self.__maxsize: Optional[int] = maxsize
+        self.__weight: int = 0
+        self.__lock: Lock = Lock()
+        self.__evictions: int = 0
+        self.__misses: int = 0
+        self.__hits: int = 0
+
+    def __iter__(self) -> Iterator[CK]:
+        return iter(list(self.__datas))
+
+    def __len__(self) -> int:
+        return len(self.__datas)
+
+    def __contains__(self, key: CK) -> bool:
+        return key in self.__datas
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        return self.__maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: Optional[int]) -> None:
+        with self.__lock:
+            self.__maxsize = value
+            self.__evict()
+
+    @property
+    def maxweight(self) -> Optional[int]:
+        return self.__maxweight
+
+    @maxweight.setter
+    def maxweight(self, value: Optional[int]) -> None:
+        with self.__lock:
+            self.__maxweight = value
+            self.__evict()
+
+    @property
+    def weight(self) -> int:
+        return self.__weight
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        return self.__evictions
+
+    def __overflow(self) -> bool:
+        if self.__maxsize is not None and len(self.__datas) > self.__maxsize:
+            return True
+        return self.__maxweight is not None and self.__weight > self.__maxweight  # noqa:E501
+
+    def __evict(self) -> None:
+        while self.__datas and self.__overflow():
+            key, _ = self.__datas.popitem(last=False)
+            self.__weight -= self.__weights.pop(key)
+            self.__evictions += 1
+
+    def __insert(self, key: CK, value: CV, weight: int) -> None:
+        self.__weight += weight - self.__weights.get(key, 0)
+        self.__weights[key] = weight
+        self.__datas[key] = value
+        self.__datas.move_to_end(key)
+        self.__evict()
+
+    def get(self, key: CK, default: Optional[CV] = None) -> Optional[CV]:
+        with self.__lock:
+            try:
+                self.__datas.move_to_end(key)
+            except KeyError:
+                self.__misses += 1
+                return default
+            self.__hits += 1
+            return self.__datas[key]
+
+    def put(self, key: CK, value: CV, weight: int = 1) -> CV:
+        with self.__lock:
+            self.__insert(key, value, weight)
+            return value
+
+    def setdefault(self, key: CK, value: CV, weight: int = 1) -> CV:
+        """Insert value if key is absent, return the cached value"""
+        with self.__lock:
+            if key in self.__datas:
+                self.__datas.move_to_end(key)
+                return self.__datas[key]
+            self.__insert(key, value, weight)
+            return value
+
+    def pop(self, key: CK, default: Optional[CV] = None) -> Optional[CV]:
+        with self.__lock:
+            self.__weight -= self.__weights.pop(key, 0)
+            return self.__datas.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters"""
+        with self.__lock:
+            self.__datas.clear()
+            self.__weights.clear()
+            self.__weight = 0
+            self.__evictions = 0
+            self.__misses = 0
+            self.__hits = 0
@@ -1,9 +1,30 @@
 # coding:utf-8
 
-from xlc.database.langtags import LangDict  # noqa:F401
-from xlc.database.langtags import LangItem  # noqa:F401
-from xlc.database.langtags import LangMark  # noqa:F401
-from xlc.database.langtags import LangMarks  # noqa:F401
-from xlc.database.langtags import LangT  # noqa:F401
-from xlc.database.langtags import LangTag  # noqa:F401
-from xlc.database.langtags import LangTags  # noqa:F401
+from typing import Dict
+from typing import TYPE_CHECKING
+
+from xlc.lazy import attach
+
+if TYPE_CHECKING:
+    from xlc.database.langtags import LangDict  # noqa:F401
+    from xlc.database.langtags import LangItem  # noqa:F401
+    from xlc.database.langtags import LangMark  # noqa:F401
+    from xlc.database.langtags import LangMarks  # noqa:F401
+    from xlc.database.langtags import LangT  # noqa:F401
+    from xlc.database.langtags import LangTag  # noqa:F401
+    from xlc.database.langtags import LangTags  # noqa:F401
+
+# attributes are imported on first access (PEP 562)
+LAZY: Dict[str, str] = {
+    "LangDict": "xlc.database.langtags",
+    "LangItem": "xlc.database.langtags",
+    "LangMark": "xlc.database.langtags",
+    "LangMarks": "xlc.database.langtags",
+    "LangT": "xlc.database.langtags",
+    "LangTag": "xlc.database.langtags",
+    "LangTags": "xlc.database.langtags",
+}
+
+__all__ = list(LAZY)
+
+__getattr__, __dir__ = attach(__name__, LAZY)
@@ -1,6 +1,10 @@
 # coding:utf-8
 
 import os
+from sys import intern
+from threading import RLock
+from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import Iterable
 from typing import Iterator
@@ -8,13 +12,15 @@ from typing import List
 from typing import Optional
 from typing import Tuple
 from typing import TypeVar
+from typing import Union
 
-from toml import load
-
+from xlc.cache import LRUCache
+from xlc.database.registry import Record
 from xlc.database.subtags import Language
 from xlc.database.subtags import Region
 from xlc.database.subtags import Script
 from xlc.database.subtags import Stag
+from xlc.observer import Observers
 
 BASE: str = os.path.dirname(__file__)
 
@@ -23,7 +29,12 @@ class LangTag:
     """Language tag
 
     The syntax of the language tag in BCP47 is:
-        langtag       = language["-" script]["-" region]
+        langtag       = language
+                        ["-" script]
+                        ["-" region]
+                        *("-" variant)
+                        *("-" extension)
+                        ["-" privateuse]
 
         language      = 2*3ALPHA            ; shortest ISO 639 code
                         ["-" extlang]       ; sometimes followed by
@@ -39,50 +50,90 @@ class LangTag:
         region        = 2ALPHA              ; ISO 3166-1 code
                       / 3DIGIT              ; UN M.49 codes
 
+        variant       = 5*8alphanum         ; registered variants
+                      / (DIGIT 3alphanum)
+
+        extension     = singleton 1*("-" (2*8alphanum))
+
+        singleton     = DIGIT               ; 0 - 9
+                      / %x41-57             ; A - W
+                      / %x59-5A             ; Y - Z
+                      / %x61-77             ; a - w
+                      / %x79-7A             ; y - z
+
+        privateuse    = "x" 1*("-" (1*8alphanum))
+
+    Tags are validated against the IANA language subtag registry: extlang
+    and grandfathered or redundant tags are replaced by their preferred
+    values, deprecated subtags by their replacements, and variants must
+    exist and match one of their registered prefixes.
+
     The order of language tags is:
         1. language-script-region
         2. language-script
         3. language-region
         4. language
+    A tag with variants, extensions or private use subtags falls back to
+    its language-script-region first.
     """
+    __slots__ = ("__language", "__script", "__region", "__variants", "__extensions",  # noqa:E501
+                 "__privateuse", "__extras", "__name", "__hash", "__tags")
     HYPHEN: str = "-"
+    PRIVATEUSE: str = "x"
+    REPLACEMENTS: Dict[str, str] = {}  # memoized registry preferred values
+    MAXREPLACEMENTS: int = 4096
 
     def __init__(self, langtag: str):
-        tags: List[str] = langtag.replace("_", self.HYPHEN).split(self.HYPHEN)
-        self.__language: Language = Language.get(tags.pop(0))
+        tags: List[str] = self.split(langtag)
+        language: str = self.canonical("language", self.check(tags.pop(0), self.is_language))  # noqa:E501
+        if tags and len(tags[0]) == 3 and tags[0].isascii() and tags[0].isalpha():  # noqa:E501
+            language = self.extlang(language, tags.pop(0))
+        self.__language: Language = Language.get(language)
         self.__script: Optional[Script] = None
         self.__region: Optional[Region] = None
-        if len(tags) == 1:
-            key = tags.pop()  # region or script
-            try:
-                script = Script.get(key)
-                self.__script = script
-            except KeyError:
-                region = Region.get(key)
-                self.__region = region
-        elif len(tags) == 2:
-            self.__region = Region.get(tags.pop())
-            self.__script = Script.get(tags.pop())
+        if tags and self.is_script(tags[0]):
+            self.__script = Script.get(self.canonical("script", tags.pop(0)))
+        if tags and self.is_region(tags[0]):
+            self.__region = Region.get(self.canonical("region", tags.pop(0)))
         full = self.filter(self.language, self.script, self.region)
-        self.__name: str = self.join(*full)
-        self.__tags: List[str] = []
+        self.__variants: Tuple[str, ...] = self.pop_variants(full, tags)
+        self.__extensions: Tuple[str, ...] = self.pop_extensions(tags)
+        self.__privateuse: Optional[str] = self.pop_privateuse(tags)
+        if tags:
+            raise KeyError(f"Invalid subtag: {tags[0]}")
+        extras: Tuple[str, ...] = self.__variants + self.__extensions
+        if self.__privateuse:
+            extras += (self.__privateuse,)
+        self.__extras: Tuple[str, ...] = extras
+        # names are interned, equal tags share their strings
+        base: str = intern(self.join(*full))
+        self.__name: str = intern(self.HYPHEN.join((base,) + extras)) if extras else base  # noqa:E501
+        self.__hash: int = hash(self.__name)
+        self.__tags: List[str] = [base] if extras else []
         if len(full) == 3:
-            self.__tags.append(self.join(full[0], full[1]))
-            self.__tags.append(self.join(full[0], full[2]))
-            self.__tags.append(self.join(full[0]))
+            self.__tags.append(intern(self.join(full[0], full[1])))
+            self.__tags.append(intern(self.join(full[0], full[2])))
+            self.__tags.append(intern(self.join(full[0])))
         elif len(full) == 2:
-            self.__tags.append(self.join(full[0]))
+            self.__tags.append(intern(self.join(full[0])))
 
     def __iter__(self) -> Iterator[str]:
         return iter(self.__tags)
 
     def __hash__(self) -> int:
-        return hash(self.name)
+        return self.__hash
 
     def __str__(self) -> str:
         return self.name
 
     def __eq__(self, other: "LangT") -> bool:
+        if self is other:
+            return True
+        if isinstance(other, LangTag):
+            # subtags are interned, identical objects mean identical codes
+            if self.language is other.language and self.script is other.script and self.region is other.region:  # noqa:E501
+                return self.__extras == other.__extras
+            return self.name == other.name
         return self.name == str(other)
 
     @property
@@ -109,6 +160,149 @@ class LangTag:
         """Country or Region in ISO 3166-1"""
         return self.__region
 
+    @property
+    def variants(self) -> Tuple[str, ...]:
+        """Registered variants, e.g. ("1996",) for de-DE-1996"""
+        return self.__variants
+
+    @property
+    def extensions(self) -> Tuple[str, ...]:
+        """Extensions ordered by singleton, e.g. ("u-ca-gregory",)"""
+        return self.__extensions
+
+    @property
+    def privateuse(self) -> Optional[str]:
+        """Private use subtags, e.g. x-private"""
+        return self.__privateuse
+
+    @classmethod
+    def is_language(cls, subtag: str) -> bool:
+        """2*3ALPHA / 4ALPHA / 5*8ALPHA"""
+        return 2 <= len(subtag) <= 8 and subtag.isascii() and subtag.isalpha()  # noqa:E501
+
+    @classmethod
+    def is_script(cls, subtag: str) -> bool:
+        """4ALPHA"""
+        return len(subtag) == 4 and subtag.isascii() and subtag.isalpha()
+
+    @classmethod
+    def is_region(cls, subtag: str) -> bool:
+        """2ALPHA / 3DIGIT"""
+        if not subtag.isascii():
+            return False
+        if len(subtag) == 2:
+            return subtag.isalpha()
+        return len(subtag) == 3 and subtag.isdigit()
+
+    @classmethod
+    def is_variant(cls, subtag: str) -> bool:
+        """5*8alphanum / (DIGIT 3alphanum)"""
+        if not subtag.isascii() or not subtag.isalnum():
+            return False
+        return 5 <= len(subtag) <= 8 or (len(subtag) == 4 and subtag[0].isdigit())  # noqa:E501
+
+    @classmethod
+    def is_singleton(cls, subtag: str) -> bool:
+        """DIGIT / ALPHA except x"""
+        return len(subtag) == 1 and subtag.isascii() and subtag.isalnum() and subtag.lower() != cls.PRIVATEUSE  # noqa:E501
+
+    @classmethod
+    def is_alphanum(cls, subtag: str, minimum: int, maximum: int) -> bool:
+        return minimum <= len(subtag) <= maximum and subtag.isascii() and subtag.isalnum()  # noqa:E501
+
+    @classmethod
+    def split(cls, langtag: str) -> List[str]:
+        """Split into subtags, grandfathered and redundant tags replaced"""
+        langtag = langtag.replace("_", cls.HYPHEN)
+        if cls.HYPHEN in langtag:
+            preferred: str = cls.replacement("grandfathered", langtag) or cls.replacement("redundant", langtag)  # noqa:E501
+            if preferred:
+                return preferred.split(cls.HYPHEN)
+        return langtag.split(cls.HYPHEN)
+
+    @classmethod
+    def canonical(cls, kind: str, subtag: str) -> str:
+        """Replace deprecated subtag with its preferred value"""
+        return cls.replacement(kind, subtag) or subtag
+
+    @classmethod
+    def replacement(cls, kind: str, subtag: str) -> str:
+        """Preferred value replacing subtag, memoized, empty if none"""
+        key: str = f"{kind}:{subtag}".lower()
+        try:
+            return cls.REPLACEMENTS[key]
+        except KeyError:
+            pass
+        record: Optional[Record] = Record.find(kind, subtag)
+        preferred: str = ""
+        if record is not None and record.preferred_value and (record.deprecated or kind in ("grandfathered", "redundant")):  # noqa:E501
+            preferred = record.preferred_value
+        if len(cls.REPLACEMENTS) >= cls.MAXREPLACEMENTS:
+            cls.REPLACEMENTS.clear()  # bound the memory of malformed inputs
+        cls.REPLACEMENTS[key] = preferred
+        return preferred
+
+    @classmethod
+    def extlang(cls, language: str, subtag: str) -> str:
+        """Replace language-extlang with the extlang's preferred value"""
+        record: Optional[Record] = Record.find("extlang", subtag)
+        if record is None or language.lower() not in (prefix.lower() for prefix in record.prefixes):  # noqa:E501
+            raise KeyError(f"Invalid extlang: {subtag}")
+        return record.preferred_value or subtag
+
+    @classmethod
+    def pop_variants(cls, stags: Tuple[Stag, ...], subtags: List[str]) -> Tuple[str, ...]:  # noqa:E501
+        """Pop registered variants whose prefix matches preceding subtags"""
+        if not subtags:
+            return ()
+        present: List[str] = [str(stag).lower() for stag in stags]
+        variants: List[str] = []
+        while subtags and cls.is_variant(subtags[0]):
+            variant: str = subtags.pop(0).lower()
+            record: Optional[Record] = Record.find("variant", variant)
+            if record is None or variant in variants:
+                raise KeyError(f"Invalid variant: {variant}")
+            if record.prefixes and not any(all(subtag in present for subtag in prefix.lower().split(cls.HYPHEN)) for prefix in record.prefixes):  # noqa:E501
+                raise KeyError(f"Invalid prefix for variant: {variant}")
+            present.append(variant)
+            variants.append(variant)
+        return tuple(variants)
+
+    @classmethod
+    def pop_extensions(cls, subtags: List[str]) -> Tuple[str, ...]:
+        """Pop extensions, each singleton followed by 2*8alphanum subtags"""
+        if not subtags:
+            return ()
+        extensions: Dict[str, str] = {}
+        while subtags and cls.is_singleton(subtags[0]):
+            singleton: str = subtags.pop(0).lower()
+            values: List[str] = [singleton]
+            while subtags and cls.is_alphanum(subtags[0], 2, 8):
+                values.append(subtags.pop(0).lower())
+            if len(values) < 2 or singleton in extensions:
+                raise KeyError(f"Invalid extension: {singleton}")
+            extensions[singleton] = cls.HYPHEN.join(values)
+        return tuple(extensions[singleton] for singleton in sorted(extensions))  # noqa:E501
+
+    @classmethod
+    def pop_privateuse(cls, subtags: List[str]) -> Optional[str]:
+        """Pop private use subtags, "x" followed by 1*8alphanum subtags"""
+        if not subtags or subtags[0].lower() != cls.PRIVATEUSE:
+            return None
+        values: List[str] = [subtags.pop(0).lower()]
+        while subtags and cls.is_alphanum(subtags[0], 1, 8):
+            values.append(subtags.pop(0).lower())
+        if len(values) < 2:
+            raise KeyError(f"Invalid private use: {cls.HYPHEN.join(values)}")
+        return cls.HYPHEN.join(values)
+
+    @classmethod
+    def check(cls, subtag: str, shape: Callable[[str], bool]) -> str:
+        """Reject malformed subtags before touching the database"""
+        if not shape(subtag):
+            raise KeyError(f"Invalid subtag: {subtag}")
+        return subtag
+
     @classmethod
     def filter(cls, *tags: Optional[Stag]) -> Tuple[Stag, ...]:
         return tuple(filter(None, tags))
@@ -125,24 +319,141 @@ class LangTag:
     def get_name(cls, langtag: "LangT") -> str:
         return langtag.name if isinstance(langtag, LangTag) else LangTag(langtag).name  # noqa:E501
 
+    @property
+    def codes(self) -> "LangCodes":
+        """Compact (language, script, region, extras) codes
+
+        extras are the canonical variants, extensions and private use
+        subtags, e.g. "1996" for de-DE-1996, so that no subtag is lost.
+        """
+        return (self.language.code,
+                self.script.code if self.script else None,
+                self.region.code if self.region else None,
+                self.HYPHEN.join(self.__extras) if self.__extras else None)
+
+    @classmethod
+    def fold(cls, langtag: str) -> str:
+        """Case-insensitive form, "ZH_hans_cn" and "zh-Hans-CN" are equal"""
+        return langtag.replace("_", cls.HYPHEN).lower()
+
+    @classmethod
+    def parse_many(cls, langtags: Iterable[str], compact: bool = False,
+                   errors: Optional[Dict[str, str]] = None
+                   ) -> List[Optional[Union["LangTag", "LangCodes"]]]:
+        """Parse language tags in bulk
+
+        Each distinct input, folded case-insensitively, is parsed once.
+        Results are in input order, as LangCodes tuples if compact, and
+        None for invalid inputs, whose errors are collected in errors.
+        """
+        results: List[Optional[Union[LangTag, LangCodes]]] = []
+        raws: Dict[str, Optional[Union[LangTag, LangCodes]]] = {}
+        folds: Dict[str, Tuple[Optional[Union[LangTag, LangCodes]], str]] = {}  # noqa:E501
+        for langtag in langtags:
+            try:
+                results.append(raws[langtag])
+                continue
+            except KeyError:
+                pass
+            fold: str = cls.fold(langtag)
+            if fold not in folds:
+                try:
+                    ltag: LangTag = LangTag(langtag)
+                    folds[fold] = (ltag.codes if compact else ltag, "")
+                except KeyError as error:
+                    folds[fold] = (None, str(error))
+            result, error = folds[fold]
+            if error and errors is not None:
+                errors[langtag] = error
+            results.append(raws.setdefault(langtag, result))
+        return results
+
 
 LangT = TypeVar("LangT", str, LangTag)
+LangCodes = Tuple[str, Optional[str], Optional[str], Optional[str]]
 
 
 class LangDict(Dict[str, LangTag]):
-    def __init__(self):
+    """Language tags with a bounded cache of parsed inputs
+
+    Only pinned canonical tags, such as the ones backing catalogs, are
+    kept for good. Other canonical tags and raw inputs, folded case-
+    insensitively so that "ZH_hans_cn" and "zh-Hans-CN" share one entry,
+    are kept in an LRU cache of at most maxsize entries (unbounded if
+    None), so arbitrary requested tags do not grow it without limit.
+    """
+    MAXSIZE: int = 4096
+
+    def __init__(self, maxsize: Optional[int] = MAXSIZE):
         super().__init__()
+        self.__aliases: LRUCache[str, LangTag] = LRUCache(maxsize=maxsize)
 
     def __getitem__(self, index: str) -> LangTag:
         return self.get(index)
 
+    @property
+    def size(self) -> int:
+        """Number of pinned tags and cached entries"""
+        return len(self) + len(self.__aliases)
+
+    @property
+    def evictions(self) -> int:
+        return self.__aliases.evictions
+
+    def pin(self, langtag: LangT) -> LangTag:
+        """Keep the canonical tag for good"""
+        ltag: LangTag = self.get(langtag)
+        return self.setdefault(ltag.name, ltag)
+
     def get(self, langtag: LangT) -> LangTag:
-        lang: str = langtag.name if isinstance(langtag, LangTag) else langtag
-        if lang not in self:
-            ltag: LangTag = LangTag(lang)
-            self.setdefault(ltag.name, ltag)
-            self.setdefault(lang, self[ltag.name])
-        return super().__getitem__(lang)
+        if isinstance(langtag, LangTag):
+            if (ltag := super().get(langtag.name)) is not None:
+                return ltag
+            return self.__aliases.setdefault(langtag.name, langtag)
+        if (ltag := super().get(langtag)) is not None:
+            return ltag
+        fold: str = LangTag.fold(langtag)
+        if (ltag := self.__aliases.get(fold)) is None:
+            parsed: LangTag = LangTag(langtag)
+            canonical: Optional[LangTag] = super().get(parsed.name)
+            if canonical is None:
+                canonical = self.__aliases.setdefault(parsed.name, parsed)
+            ltag = self.__aliases.put(fold, canonical)
+        return ltag
+
+
+class Shared():
+    """Lazily built process-wide instance
+
+    The instance is rebuilt when any config file changes (mtime or size)
+    or when explicitly reloaded.
+    """
+    SHARED: Dict[type, Tuple[Tuple[Tuple[int, int], ...], Any]] = {}
+    LOCK: RLock = RLock()
+
+    @classmethod
+    def configs(cls) -> Tuple[str, ...]:
+        raise NotImplementedError()
+
+    @classmethod
+    def signature(cls) -> Tuple[Tuple[int, int], ...]:
+        return tuple((stat.st_mtime_ns, stat.st_size) for stat in (os.stat(path) for path in cls.configs()))  # noqa:E501
+
+    @classmethod
+    def from_config(cls) -> Any:
+        raise NotImplementedError()
+
+    @classmethod
+    def shared(cls, reload: bool = False) -> Any:
+        signature = cls.signature()
+        shared = cls.SHARED.get(cls)
+        if reload or shared is None or shared[0] != signature:
+            with cls.LOCK:
+                shared = cls.SHARED.get(cls)
+                if reload or shared is None or shared[0] != signature:
+                    shared = (signature, cls.from_config())
+                    cls.SHARED[cls] = shared
+        return shared[1]
 
 
 class LangMark(Dict[str, str]):
@@ -157,7 +468,7 @@ class LangMark(Dict[str, str]):
         return self.__langtag
 
 
-class LangMarks(Dict[str, LangMark]):
+class LangMarks(Shared, Dict[str, LangMark]):
     CONFIG: str = os.path.join(BASE, "langmark.toml")
 
     def __init__(self):
@@ -177,10 +488,20 @@ class LangMarks(Dict[str, LangMark]):
 
     @classmethod
     def load_config(cls) -> Tuple[LangMark, ...]:
+        from toml import load
+
         with open(cls.CONFIG, "r", encoding="utf-8") as rhdl:
             return tuple(LangMark(langtag=LangTag.get_name(lang), regions=data)  # noqa:E501
                          for lang, data in load(rhdl).items())
 
+    @classmethod
+    def configs(cls) -> Tuple[str, ...]:
+        return (cls.CONFIG,)
+
+    @classmethod
+    def shared(cls, reload: bool = False) -> "LangMarks":
+        return super().shared(reload=reload)
+
     @classmethod
     def from_config(cls) -> "LangMarks":
         instance = cls()
@@ -190,6 +511,8 @@ class LangMarks(Dict[str, LangMark]):
 
 
 class LangItem():
+    __slots__ = ("__langtag", "__aliases", "__description", "__recognition")
+
     def __init__(self, langtag: LangT, aliases: Iterable[LangT] = [], description: str = "", recognition: str = ""):  # noqa:E501
         self.__langtag: LangTag = LangTag.get_tag(langtag)
         self.__aliases: Tuple[str, ...] = tuple(LangTag.get_name(a) for a in aliases)  # noqa:E501
@@ -216,12 +539,12 @@ class LangItem():
         return self.__recognition
 
 
-class LangTags():
+class LangTags(Shared):
     """Language tags"""
     CONFIG: str = os.path.join(BASE, "langtags.toml")
 
     def __init__(self):
-        self.__langmarks: LangMarks = LangMarks.from_config()
+        self.__langmarks: LangMarks = LangMarks.shared()
         self.__tags: Dict[str, LangItem] = {}
 
     def __iter__(self) -> Iterator[str]:
@@ -252,15 +575,34 @@ class LangTags():
         """Lookup language tag or replaceable subtags"""
         ltag: LangTag = LangTag.get_tag(langtag)
         if ltag.name in self.__tags:
+            if Observers.OBSERVERS:
+                Observers.emit("on_resolve", ltag.name, ltag.name, 0)
             return self.__tags[ltag.name]
-        for _tag in ltag.tags:
+        for depth, _tag in enumerate(ltag.tags, start=1):
             name: str = LangTag.get_name(_tag)
             if name in self.__tags:
+                if Observers.OBSERVERS:
+                    Observers.emit("on_resolve", ltag.name, name, depth)
                 return self.__tags[name]
+        if Observers.OBSERVERS:
+            Observers.emit("on_resolve", ltag.name, None, 0)
         raise LookupError(f"No such language tag: {langtag}")
 
+    @classmethod
+    def configs(cls) -> Tuple[str, ...]:
+        return (cls.CONFIG, LangMarks.CONFIG)
+
+    @classmethod
+    def shared(cls, reload: bool = False) -> "LangTags":
+        """Process-wide instance reused by Message and Segment"""
+        if reload:
+            LangMarks.shared(reload=True)
+        return super().shared(reload=reload)
+
     @classmethod
     def from_config(cls) -> "LangTags":
+        from toml import load
+
         instance = cls()
         with open(cls.CONFIG, "r", encoding="utf-8") as rhdl:
             for lang, data in load(rhdl).items():
@@ -0,0 +1,171 @@
+# coding:utf-8
+
+import os
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from xlc.cache import LRUCache
+from xlc.database.subtags import BASE
+from xlc.database.subtags import Stag
+from xlc.database.subtags import StagDB
+
+
+class Record(Stag):
+    """Record in IANA language subtag registry
+
+    Records are keyed by "type:subtag", e.g. "variant:1996", and by
+    "type:tag" for grandfathered and redundant tags, e.g.
+    "grandfathered:zh-min-nan". Private use ranges are expanded.
+    """
+    CONFIG: str = os.path.join(BASE, "registry.db")
+    FIELDS: Sequence[str] = ("type", "subtag", "description", "added", "deprecated", "preferred_value",  # noqa:E501
+                             "suppress_script", "macrolanguage", "prefix", "scope", "comments")  # noqa:E501
+    CACHE: LRUCache[str, Stag] = LRUCache(maxsize=1024)
+    MISSES: LRUCache[str, bool] = LRUCache(maxsize=1024)
+
+    def __init__(self, data: Mapping[str, str]):
+        self.__type: str = data["type"]
+        self.__subtag: str = data["subtag"]
+        self.__descriptions: Tuple[str, ...] = tuple(data.get("description", "").splitlines())  # noqa:E501
+        self.__added: str = data.get("added", "")
+        self.__deprecated: Optional[str] = data.get("deprecated")
+        self.__preferred_value: Optional[str] = data.get("preferred_value")
+        self.__suppress_script: Optional[str] = data.get("suppress_script")
+        self.__macrolanguage: Optional[str] = data.get("macrolanguage")
+        self.__prefixes: Tuple[str, ...] = tuple(data.get("prefix", "").splitlines())  # noqa:E501
+        self.__scope: Optional[str] = data.get("scope")
+        self.__comments: Optional[str] = data.get("comments")
+
+    @property
+    def code(self) -> str:
+        return self.__subtag
+
+    @property
+    def type(self) -> str:
+        return self.__type
+
+    @property
+    def descriptions(self) -> Tuple[str, ...]:
+        return self.__descriptions
+
+    @property
+    def added(self) -> str:
+        return self.__added
+
+    @property
+    def deprecated(self) -> Optional[str]:
+        return self.__deprecated
+
+    @property
+    def preferred_value(self) -> Optional[str]:
+        return self.__preferred_value
+
+    @property
+    def suppress_script(self) -> Optional[str]:
+        return self.__suppress_script
+
+    @property
+    def macrolanguage(self) -> Optional[str]:
+        return self.__macrolanguage
+
+    @property
+    def prefixes(self) -> Tuple[str, ...]:
+        return self.__prefixes
+
+    @property
+    def scope(self) -> Optional[str]:
+        return self.__scope
+
+    @property
+    def comments(self) -> Optional[str]:
+        return self.__comments
+
+    @classmethod
+    def get(cls, type: str, subtag: str) -> "Record":  # pylint:disable=W0622
+        return cls.intern(f"{type}:{subtag}")
+
+    @classmethod
+    def find(cls, type: str, subtag: str) -> Optional["Record"]:  # pylint:disable=W0622  # noqa:E501
+        try:
+            return cls.get(type, subtag)
+        except KeyError:
+            return None
+
+
+class Registry():
+    """Streaming parser and compiler of IANA language subtag registry"""
+    SEPARATOR: str = "%%"
+
+    @classmethod
+    def parse(cls, lines: Iterable[str]) -> Iterator[Dict[str, List[str]]]:
+        """Yield records field by field, e.g. {"Prefix": ["de"], ...}"""
+        record: Dict[str, List[str]] = {}
+        field: Optional[List[str]] = None
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if line == cls.SEPARATOR:
+                if record:
+                    yield record
+                record, field = {}, None
+            elif line[:1].isspace():
+                if field is not None:  # continuation of previous field
+                    field[-1] = f"{field[-1]} {line.strip()}"
+            elif line:
+                name, _, value = line.partition(":")
+                field = record.setdefault(name.strip(), [])
+                field.append(value.strip())
+        if record:
+            yield record
+
+    @classmethod
+    def expand(cls, subtag: str) -> Iterator[str]:
+        """Expand private use range, e.g. "QM..QZ\""""
+        first, _, last = subtag.partition("..")
+        if not last:
+            yield subtag
+            return
+
+        def number(value: str) -> int:
+            result: int = 0
+            for char in value.lower():
+                result = result * 26 + ord(char) - ord("a")
+            return result
+
+        def string(value: int) -> str:
+            chars: List[str] = []
+            for _ in range(len(first)):
+                value, char = divmod(value, 26)
+                chars.append(chr(ord("a") + char))
+            result: str = "".join(reversed(chars))
+            if first.isupper():
+                return result.upper()
+            return result.title() if first.istitle() else result
+
+        for value in range(number(first), number(last) + 1):
+            yield string(value)
+
+    @classmethod
+    def records(cls, lines: Iterable[str]) -> Iterator[Tuple[str, Dict[str, str]]]:  # noqa:E501
+        for fields in cls.parse(lines):
+            if "Type" not in fields:
+                continue  # File-Date
+            kind: str = fields["Type"][0]
+            datas: Dict[str, str] = {}
+            for field in Record.FIELDS:
+                values: List[str] = fields.get(field.replace("_", "-").title(), [])  # noqa:E501
+                if values:
+                    datas[field] = "\n".join(values)
+            for subtag in cls.expand((fields.get("Subtag") or fields["Tag"])[0]):  # noqa:E501
+                yield f"{kind}:{subtag}".lower(), dict(datas, subtag=subtag)
+
+    @classmethod
+    def compile(cls, source: str, path: str) -> None:
+        with open(source, "r", encoding="utf-8") as rhdl:
+            records: Dict[str, Dict[str, str]] = dict(cls.records(rhdl))
+        StagDB.dump(path, Record.FIELDS, records)
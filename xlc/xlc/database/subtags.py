@@ -1,13 +1,151 @@
 # coding:utf-8
 
+import mmap
 import os
+from struct import Struct
 from typing import Dict
+from typing import Iterator
+from typing import Mapping
 from typing import Optional
+from typing import Sequence
+from typing import Type
+from typing import TypeVar
+
+from xlc.atomic import AtomicFile
+from xlc.cache import LRUCache
 
 BASE: str = os.path.dirname(__file__)
 
 
+class StagDB():
+    """Subtag database
+
+    The file layout is:
+        header        = magic version fields keysize count
+        fields        = *(length name)      ; record field names
+        index         = count(key offset)   ; fixed-width, sorted by key
+        records       = *(length value)     ; one value per field
+
+    All lookups are binary searches over the memory-mapped index, so no
+    file is opened or parsed per lookup.
+    """
+    MAGIC: bytes = b"XLCS"
+    VERSION: int = 1
+    HEADER: Struct = Struct("<4sHHHI")
+    OFFSET: Struct = Struct("<I")
+    LENGTH: Struct = Struct("<H")
+
+    def __init__(self, path: str):
+        with open(path, "rb") as rhdl:
+            self.__mmap: mmap.mmap = mmap.mmap(rhdl.fileno(), 0, access=mmap.ACCESS_READ)  # noqa:E501
+        magic, version, nfields, keysize, count = self.HEADER.unpack_from(self.__mmap, 0)  # noqa:E501
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a version {self.VERSION} database")  # noqa:E501
+        offset: int = self.HEADER.size
+        fields = []
+        for _ in range(nfields):
+            length: int = self.__mmap[offset]
+            fields.append(self.__mmap[offset + 1:offset + 1 + length].decode("ascii"))  # noqa:E501
+            offset += 1 + length
+        self.__fields: Sequence[str] = tuple(fields)
+        self.__keysize: int = keysize
+        self.__count: int = count
+        self.__index: int = offset
+        self.__width: int = keysize + self.OFFSET.size
+        self.__records: int = offset + count * self.__width
+        self.__path: str = path
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.key(i) for i in range(self.__count))
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) >= 0
+
+    def __getitem__(self, name: str) -> Dict[str, str]:
+        index: int = self.find(name)
+        if index < 0:
+            raise KeyError(f"{name} is not found in {self.__path}")
+        return self.record(index)
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def fields(self) -> Sequence[str]:
+        return self.__fields
+
+    def key(self, index: int) -> str:
+        start: int = self.__index + index * self.__width
+        return self.__mmap[start:start + self.__keysize].rstrip(b"\0").decode("ascii")  # noqa:E501
+
+    def find(self, name: str) -> int:
+        """Binary search the index, return -1 if not found"""
+        key: bytes = name.lower().encode("utf-8")
+        if len(key) > self.__keysize:
+            return -1
+        key = key.ljust(self.__keysize, b"\0")
+        low, high = 0, self.__count
+        while low < high:
+            middle: int = (low + high) // 2
+            start: int = self.__index + middle * self.__width
+            value: bytes = self.__mmap[start:start + self.__keysize]
+            if value < key:
+                low = middle + 1
+            elif value > key:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def record(self, index: int) -> Dict[str, str]:
+        start: int = self.__index + index * self.__width + self.__keysize
+        offset: int = self.__records + self.OFFSET.unpack_from(self.__mmap, start)[0]  # noqa:E501
+        data: Dict[str, str] = {}
+        for field in self.__fields:
+            length: int = self.LENGTH.unpack_from(self.__mmap, offset)[0]
+            offset += self.LENGTH.size
+            if length > 0:
+                data[field] = self.__mmap[offset:offset + length].decode("utf-8")  # noqa:E501
+                offset += length
+        return data
+
+    @classmethod
+    def dump(cls, path: str, fields: Sequence[str], records: Mapping[str, Mapping[str, str]]) -> None:  # noqa:E501
+        keys = sorted(name.lower().encode("utf-8") for name in records)
+        keysize: int = max((len(key) for key in keys), default=0)
+        index: bytearray = bytearray()
+        datas: bytearray = bytearray()
+        for key in keys:
+            index += key.ljust(keysize, b"\0") + cls.OFFSET.pack(len(datas))
+            for field in fields:
+                value: bytes = records[key.decode("utf-8")].get(field, "").encode("utf-8")  # noqa:E501
+                datas += cls.LENGTH.pack(len(value)) + value
+        header: bytearray = bytearray(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(fields), keysize, len(keys)))  # noqa:E501
+        for field in fields:
+            header += bytes([len(field)]) + field.encode("ascii")
+        with AtomicFile(path) as whdl:  # mapped readers keep the old file
+            whdl.write(header + index + datas)
+
+
+ST = TypeVar("ST", bound="Stag")
+
+
 class Stag():
+    """Subtag interned by normalized code
+
+    Each subclass keeps its own LRU cache, so identical codes return the
+    identical object while it stays cached, and a negative cache of codes
+    known to be missing from the database.
+    """
+    DATABASES: Dict[str, StagDB] = {}
+    MISSES: LRUCache[str, bool]
+    CACHE: LRUCache[str, "Stag"]
+    CONFIG: str
+
     def __str__(self) -> str:
         return self.code
 
@@ -16,22 +154,39 @@ class Stag():
         raise NotImplementedError()
 
     @classmethod
-    def get(cls, base: str, name: str) -> Dict[str, str]:
-        from toml import load
+    def open(cls, path: str) -> StagDB:
+        if path not in cls.DATABASES:
+            cls.DATABASES.setdefault(path, StagDB(path))
+        return cls.DATABASES[path]
 
-        path: str = os.path.join(base, name.lower())
-        if os.path.isfile(path):
-            with open(path, "r", encoding="UTF-8") as rhdl:
-                return load(rhdl)
-        else:
-            raise KeyError(f"{path} is not found")
+    @classmethod
+    def get(cls, path: str, name: str) -> Dict[str, str]:
+        return cls.open(path)[name]
+
+    @classmethod
+    def intern(cls: Type[ST], index: str) -> ST:
+        key: str = index.lower()
+        stag: Optional[Stag] = cls.CACHE.get(key)
+        if stag is None:
+            if cls.MISSES.get(key):
+                raise KeyError(f"{index} is not found in {cls.CONFIG}")
+            try:
+                data: Dict[str, str] = Stag.get(cls.CONFIG, key)
+            except KeyError:
+                cls.MISSES.put(key, True)
+                raise
+            stag = cls.CACHE.setdefault(key, cls(data))
+        return stag  # type:ignore
 
 
 class Language(Stag):
     """Language in ISO 639-3"""
-    CONFIG: str = os.path.join(BASE, "languages")
+    CONFIG: str = os.path.join(BASE, "languages.db")
+    FIELDS: Sequence[str] = ("alpha_2", "alpha_3", "name")
+    CACHE: LRUCache[str, Stag] = LRUCache(maxsize=1024)
+    MISSES: LRUCache[str, bool] = LRUCache(maxsize=1024)
 
-    def __init__(self, data: Dict[str, str]):
+    def __init__(self, data: Mapping[str, str]):
         self.__alpha_2: Optional[str] = data.get("alpha_2")
         self.__alpha_3: str = data["alpha_3"]
         self.__name: str = data["name"]
@@ -54,14 +209,17 @@ class Language(Stag):
 
     @classmethod
     def get(cls, index: str) -> "Language":
-        return cls(super().get(cls.CONFIG, index))
+        return cls.intern(index)
 
 
 class Region(Stag):
     """Country or Region in ISO 3166-1"""
-    CONFIG: str = os.path.join(BASE, "regions")
+    CONFIG: str = os.path.join(BASE, "regions.db")
+    FIELDS: Sequence[str] = ("alpha_2", "alpha_3", "flag", "name", "numeric", "official_name")  # noqa:E501
+    CACHE: LRUCache[str, Stag] = LRUCache(maxsize=512)
+    MISSES: LRUCache[str, bool] = LRUCache(maxsize=1024)
 
-    def __init__(self, data: Dict[str, str]):
+    def __init__(self, data: Mapping[str, str]):
         self.__official_name: str = data["official_name"]
         self.__alpha_2: str = data["alpha_2"]
         self.__alpha_3: str = data["alpha_3"]
@@ -99,14 +257,17 @@ class Region(Stag):
 
     @classmethod
     def get(cls, index: str) -> "Region":
-        return cls(super().get(cls.CONFIG, index))
+        return cls.intern(index)
 
 
 class Script(Stag):
     """Script in ISO 15924"""
-    CONFIG: str = os.path.join(BASE, "scripts")
+    CONFIG: str = os.path.join(BASE, "scripts.db")
+    FIELDS: Sequence[str] = ("alpha_4", "name", "numeric")
+    CACHE: LRUCache[str, Stag] = LRUCache(maxsize=512)
+    MISSES: LRUCache[str, bool] = LRUCache(maxsize=1024)
 
-    def __init__(self, data: Dict[str, str]):
+    def __init__(self, data: Mapping[str, str]):
         self.__alpha_4: str = data["alpha_4"]
         self.__numeric: str = data["numeric"]
         self.__name: str = data["name"]
@@ -129,4 +290,4 @@ class Script(Stag):
 
     @classmethod
     def get(cls, index: str) -> "Script":
-        return cls(super().get(cls.CONFIG, index))
+        return cls.intern(index)
@@ -1,5 +1,34 @@
 # coding:utf-8
 
-from xlc.language.message import Message  # noqa:F401
-from xlc.language.segment import Section  # noqa:F401
-from xlc.language.segment import Segment  # noqa:F401
+from typing import Dict
+from typing import TYPE_CHECKING
+
+from xlc.lazy import attach
+
+if TYPE_CHECKING:
+    from xlc.language.catalog import Catalog  # noqa:F401
+    from xlc.language.catalog import CompiledCatalog  # noqa:F401
+    from xlc.language.message import Message  # noqa:F401
+    from xlc.language.report import LocaleReport  # noqa:F401
+    from xlc.language.report import Report  # noqa:F401
+    from xlc.language.search import SearchIndex  # noqa:F401
+    from xlc.language.segment import Section  # noqa:F401
+    from xlc.language.segment import Segment  # noqa:F401
+    from xlc.language.template import Template  # noqa:F401
+
+# attributes are imported on first access (PEP 562)
+LAZY: Dict[str, str] = {
+    "Catalog": "xlc.language.catalog",
+    "CompiledCatalog": "xlc.language.catalog",
+    "Message": "xlc.language.message",
+    "LocaleReport": "xlc.language.report",
+    "Report": "xlc.language.report",
+    "SearchIndex": "xlc.language.search",
+    "Section": "xlc.language.segment",
+    "Segment": "xlc.language.segment",
+    "Template": "xlc.language.template",
+}
+
+__all__ = list(LAZY)
+
+__getattr__, __dir__ = attach(__name__, LAZY)
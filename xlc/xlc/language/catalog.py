@@ -0,0 +1,203 @@
+# coding:utf-8
+
+from json import dumps
+from json import loads
+import mmap
+from struct import Struct
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from zlib import crc32
+
+from xlc.atomic import AtomicFile
+from xlc.database.langtags import LangItem
+
+
+class Catalog(Mapping[str, Any]):
+    """Read-only view of a segment keyed by full dotted keys
+
+    A lookup is a single dict hit and never creates sections on misses.
+    """
+
+    def __init__(self, language: LangItem, datas: Dict[str, Any]):
+        self.__language: LangItem = language
+        self.__datas: Dict[str, Any] = datas
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__datas)
+
+    def __len__(self) -> int:
+        return len(self.__datas)
+
+    def __contains__(self, index: object) -> bool:
+        return index in self.__datas
+
+    def __getitem__(self, index: str) -> Any:
+        return self.__datas[index]
+
+    @property
+    def lang(self) -> LangItem:
+        return self.__language
+
+    def get(self, index: str, default: Optional[Any] = None) -> Any:
+        return self.__datas.get(index, default)
+
+
+class CompiledCatalog(Mapping[str, Any]):
+    """Memory-mapped compiled catalog (.xlcc)
+
+    The file layout is:
+        header        = magic version count slots
+        entries       = count(key length value length type parts)
+        slots         = slots(entry)        ; open addressing hash index
+        strings       = *OCTET              ; UTF-8 keys, values and parts
+
+    An entry is looked up by its full dotted key. The key path is stored
+    as a JSON array after the value when a section or key name contains a
+    dot itself (parts is its length, 0 otherwise), so that the dotted key
+    can be split back exactly.
+
+    Keys are hashed with CRC-32 into a power-of-two slot table that is at
+    most half full. Values are decoded on access, so opening a catalog
+    parses nothing and worker processes share the mapped pages.
+    """
+    MAGIC: bytes = b"XLCC"
+    VERSION: int = 2
+    HEADER: Struct = Struct("<4sHII")
+    ENTRY: Struct = Struct("<IIIIBI")
+    SLOT: Struct = Struct("<I")
+    STRING: int = 0
+    JSON: int = 1
+    TOML: int = 2  # dates and times, or arrays of them
+
+    def __init__(self, language: LangItem, path: str):
+        with open(path, "rb") as rhdl:
+            self.__mmap: mmap.mmap = mmap.mmap(rhdl.fileno(), 0, access=mmap.ACCESS_READ)  # noqa:E501
+        magic, version, count, slots = self.HEADER.unpack_from(self.__mmap, 0)  # noqa:E501
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a version {self.VERSION} compiled catalog")  # noqa:E501
+        self.__entries: int = self.HEADER.size
+        self.__slots: int = self.__entries + count * self.ENTRY.size
+        self.__strings: int = self.__slots + slots * self.SLOT.size
+        self.__language: LangItem = language
+        self.__count: int = count
+        self.__mask: int = slots - 1
+        self.__path: str = path
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.key(i) for i in range(self.__count))
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __contains__(self, index: object) -> bool:
+        return isinstance(index, str) and self.find(index) >= 0
+
+    def __getitem__(self, index: str) -> Any:
+        entry: int = self.find(index)
+        if entry < 0:
+            raise KeyError(index)
+        return self.value(entry)
+
+    @property
+    def lang(self) -> LangItem:
+        return self.__language
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def get(self, index: str, default: Optional[Any] = None) -> Any:
+        entry: int = self.find(index)
+        return self.value(entry) if entry >= 0 else default
+
+    def key(self, entry: int) -> str:
+        offset, length, _, _, _, _ = self.ENTRY.unpack_from(self.__mmap, self.__entries + entry * self.ENTRY.size)  # noqa:E501
+        start: int = self.__strings + offset
+        return self.__mmap[start:start + length].decode("utf-8")
+
+    def value(self, entry: int) -> Any:
+        _, _, offset, length, kind, _ = self.ENTRY.unpack_from(self.__mmap, self.__entries + entry * self.ENTRY.size)  # noqa:E501
+        start: int = self.__strings + offset
+        value: str = self.__mmap[start:start + length].decode("utf-8")
+        return self.decode(kind, value)
+
+    def parts(self, entry: int) -> Tuple[str, ...]:
+        """Section and key names of entry"""
+        _, _, offset, length, _, parts = self.ENTRY.unpack_from(self.__mmap, self.__entries + entry * self.ENTRY.size)  # noqa:E501
+        if parts == 0:
+            return tuple(self.key(entry).split("."))
+        start: int = self.__strings + offset + length
+        return tuple(loads(self.__mmap[start:start + parts].decode("utf-8")))  # noqa:E501
+
+    def find(self, index: str) -> int:
+        """Probe the hash index, return -1 if not found"""
+        key: bytes = index.encode("utf-8")
+        slot: int = crc32(key) & self.__mask
+        while (entry := self.SLOT.unpack_from(self.__mmap, self.__slots + slot * self.SLOT.size)[0]) != 0:  # noqa:E501
+            offset, length, _, _, _, _ = self.ENTRY.unpack_from(self.__mmap, self.__entries + (entry - 1) * self.ENTRY.size)  # noqa:E501
+            start: int = self.__strings + offset
+            if self.__mmap[start:start + length] == key:
+                return entry - 1
+            slot = (slot + 1) & self.__mask
+        return -1
+
+    def close(self) -> None:
+        self.__mmap.close()
+
+    @classmethod
+    def encode(cls, value: Any) -> Tuple[int, str]:
+        """Kind and text of value, TOML for what JSON cannot encode"""
+        if isinstance(value, str):
+            return cls.STRING, value
+        try:
+            return cls.JSON, dumps(value)
+        except TypeError:
+            from toml import dumps as toml_dumps
+
+            return cls.TOML, toml_dumps({"value": value})
+
+    @classmethod
+    def decode(cls, kind: int, text: str) -> Any:
+        if kind == cls.STRING:
+            return text
+        if kind == cls.JSON:
+            return loads(text)
+        from toml import loads as toml_loads
+
+        return toml_loads(text)["value"]
+
+    @classmethod
+    def dumps(cls, items: Iterable[Tuple[Tuple[str, ...], Any]]) -> bytes:
+        """Compile key paths (section and key names) and their values"""
+        datas: List[Tuple[Tuple[str, ...], Any]] = list(items)
+        slots: int = 1
+        while slots < len(datas) * 2:
+            slots *= 2
+        table: List[int] = [0] * slots
+        entries: bytearray = bytearray()
+        strings: bytearray = bytearray()
+        for entry, (names, value) in enumerate(datas):
+            key: bytes = ".".join(names).encode("utf-8")
+            kind, text = cls.encode(value)
+            data: bytes = text.encode("utf-8")
+            parts: bytes = dumps(names, ensure_ascii=False).encode("utf-8") if any("." in name for name in names) else b""  # noqa:E501
+            entries += cls.ENTRY.pack(len(strings), len(key), len(strings) + len(key), len(data), kind, len(parts))  # noqa:E501
+            strings += key + data + parts
+            slot: int = crc32(key) & (slots - 1)
+            while table[slot] != 0:
+                slot = (slot + 1) & (slots - 1)
+            table[slot] = entry + 1
+        header: bytes = cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(datas), slots)  # noqa:E501
+        return header + entries + b"".join(cls.SLOT.pack(i) for i in table) + strings  # noqa:E501
+
+    @classmethod
+    def dump(cls, path: str, items: Iterable[Tuple[Tuple[str, ...], Any]]) -> None:  # noqa:E501
+        """Write atomically, mapped readers keep the replaced file"""
+        with AtomicFile(path) as whdl:
+            whdl.write(cls.dumps(items))
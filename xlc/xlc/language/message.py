@@ -1,33 +1,96 @@
 # coding:utf-8
 
+from logging import getLogger
 import os
+from threading import Event
+from threading import Lock
+from threading import Thread
+from time import perf_counter
+from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import TYPE_CHECKING
+from typing import Tuple
+from typing import Union
 
+from xlc.cache import LRUCache
 from xlc.database.langtags import LangDict
 from xlc.database.langtags import LangItem
 from xlc.database.langtags import LangT
 from xlc.database.langtags import LangTag
 from xlc.database.langtags import LangTags
+from xlc.language.catalog import Catalog
+from xlc.language.catalog import CompiledCatalog
 from xlc.language.segment import Segment
+from xlc.observer import Observers
+
+if TYPE_CHECKING:  # asyncio and concurrent.futures are imported on first use
+    from asyncio import AbstractEventLoop
+    from asyncio import Future
+    from concurrent.futures import Executor
+
+CatalogT = Union[Catalog, CompiledCatalog]
+
+logger = getLogger(__name__)
+
+
+class MessageStats(NamedTuple):
+    loaded: int
+    weight: int
+    hits: int
+    misses: int
+    loads: int
+    evictions: int
+    load_time: float
 
 
 class Message():
+    """Message catalogs in a directory
+
+    Loaded segments are kept in an LRU cache bounded by maxsize (segment
+    count) and maxbytes (approximated by the source file sizes), both are
+    unbounded by default.
+
+    Catalogs are scanned once at initialization, call refresh() or start
+    watch() to pick up changed, added and removed files.
+
+    A compiled catalog (.xlcc) next to the source is loaded instead when
+    it is not older than the source. If mapped, catalog() serves memory-
+    mapped compiled catalogs, compiling stale ones on first use, so that
+    pre-forked workers share the pages instead of building their own
+    trees; run xlc-compile before forking to avoid compiling in workers.
+    """
     SUFFIX: str = ".xlc"
+    COMPILED: str = ".xlcc"
+    ACCEPT_LENGTH: int = 4096  # longer Accept-Language headers are truncated
+    ACCEPT_RANGES: int = 32  # further language ranges are ignored
+    NEGOTIATIONS: int = 4096  # cached Accept-Language headers
+    RESOLUTIONS: int = 4096  # cached resolutions of requested tags
 
-    def __init__(self, base: str):
-        self.__objects: Dict[str, Segment] = {}
+    def __init__(self, base: str, maxsize: Optional[int] = None, maxbytes: Optional[int] = None, mapped: bool = False):  # noqa:E501
+        self.__objects: LRUCache[str, Segment] = LRUCache(maxsize=maxsize, maxweight=maxbytes)  # noqa:E501
+        self.__catalogs: LRUCache[str, CatalogT] = LRUCache(maxsize=maxsize, maxweight=maxbytes)  # noqa:E501
+        self.__negotiations: LRUCache[str, str] = LRUCache(maxsize=self.NEGOTIATIONS)  # noqa:E501
+        self.__resolutions: Dict[str, Optional[LangTag]] = {}
+        self.__inflights: Dict[Tuple["AbstractEventLoop", str], "Future[Segment]"] = {}  # noqa:E501
+        self.__mapped: bool = mapped
+        self.__lock: Lock = Lock()
+        self.__load_time: float = 0.0
+        self.__loads: int = 0
         self.__languages: LangDict = LangDict()
         self.__segments: Dict[str, str] = {}
-
-        langtags: LangTags = LangTags.from_config()
-        for file in os.listdir(base):
-            key, ext = os.path.splitext(file)
-            if ext == self.SUFFIX and os.path.isfile(path := os.path.join(base, file)):  # noqa:E501
-                lang: LangItem = langtags[key]
-                for atag in lang.aliases:
-                    self.__segments.setdefault(atag, path)
-                self.__segments[lang.name] = path
+        self.__signatures: Dict[str, Tuple[int, int]] = {}
+        self.__failures: Dict[str, Tuple[int, int]] = {}  # signatures failed to load  # noqa:E501
+        self.__refresh: Lock = Lock()
+        self.__watcher: Optional[Thread] = None
+        self.__stopped: Event = Event()
+        self.__base: str = base
+        self.__update(strict=True)  # a catalog that fails raises as ever
 
     def __iter__(self) -> Iterator[str]:
         return iter(self.__segments)
@@ -41,23 +104,363 @@ class Message():
     def __getitem__(self, langtag: LangT) -> Segment:
         return self.load(self.languages.get(langtag))
 
+    @property
+    def base(self) -> str:
+        return self.__base
+
+    @property
+    def mapped(self) -> bool:
+        return self.__mapped
+
     @property
     def languages(self) -> LangDict:
         return self.__languages
 
-    def lookup(self, langtag: LangT) -> Segment:
+    @property
+    def stats(self) -> MessageStats:
+        return MessageStats(loaded=len(self.__objects),
+                            weight=self.__objects.weight,
+                            hits=self.__objects.hits,
+                            misses=self.__objects.misses,
+                            loads=self.__loads,
+                            evictions=self.__objects.evictions,
+                            load_time=self.__load_time)
+
+    def resolve(self, langtag: LangT) -> LangTag:
+        """Resolve language tag or replaceable subtags to a catalog
+
+        Resolutions, including misses, are memoized per raw and canonical
+        tag until catalogs are added or removed.
+        """
+        key: str = langtag if isinstance(langtag, str) else langtag.name
+        try:
+            ltag: Optional[LangTag] = self.__resolutions[key]
+        except KeyError:
+            ltag = self.__resolve(self.languages.get(langtag), key)
+        if Observers.OBSERVERS:
+            self.__observe(langtag, ltag)
+        if ltag is None:
+            raise LookupError(f"No such language tag: {langtag}")
+        return ltag
+
+    def __observe(self, langtag: LangT, resolved: Optional[LangTag]) -> None:  # noqa:E501
         ltag: LangTag = self.languages.get(langtag)
-        if ltag.name in self.__segments:
-            return self.load(ltag)
-        for _tag in ltag.tags:
-            ltag = self.languages[_tag]
-            if ltag.name in self.__segments:
-                return self.load(ltag)
-        raise LookupError(f"No such language tag: {langtag}")
+        if resolved is None:
+            Observers.emit("on_resolve", ltag.name, None, 0)
+        else:
+            Observers.emit("on_resolve", ltag.name, resolved.name, ([ltag.name] + ltag.tags).index(resolved.name))  # noqa:E501
+
+    def __resolve(self, ltag: LangTag, key: str) -> Optional[LangTag]:
+        resolutions: Dict[str, Optional[LangTag]] = self.__resolutions
+        if len(resolutions) >= self.RESOLUTIONS:
+            resolutions.clear()  # bound the memory of raw inputs
+        if ltag.name not in resolutions:
+            resolution: Optional[LangTag] = None
+            for _tag in [ltag.name] + ltag.tags:
+                if _tag in self.__segments:
+                    resolution = self.languages[_tag]
+                    break
+            resolutions[ltag.name] = resolution
+        return resolutions.setdefault(key, resolutions[ltag.name])
+
+    def lookup(self, langtag: LangT) -> Segment:
+        return self.load(self.resolve(langtag))
+
+    @classmethod
+    def accept(cls, header: str) -> List[str]:
+        """Parse Accept-Language header (RFC 9110) into language ranges
+
+        Ranges are ordered by descending quality, "*" and ranges with q=0
+        or a malformed weight are dropped.
+        """
+        ranges: List[Tuple[float, int, str]] = []
+        for item in header[:cls.ACCEPT_LENGTH].split(",")[:cls.ACCEPT_RANGES]:  # noqa:E501
+            lrange, _, weight = item.partition(";")
+            lrange = lrange.strip()
+            quality: float = 1.0
+            if weight:
+                key, _, value = weight.strip().partition("=")
+                if key.rstrip().lower() != "q":
+                    continue
+                try:
+                    quality = float(value.strip()[:5])
+                except ValueError:
+                    continue
+                if not 0.0 <= quality <= 1.0:
+                    continue
+            if lrange and lrange != "*" and quality > 0.0:
+                ranges.append((-quality, len(ranges), lrange))
+        return [lrange for _, _, lrange in sorted(ranges)]
+
+    def negotiate(self, header: str, default: Optional[LangT] = None) -> Segment:  # noqa:E501
+        """Best catalog for Accept-Language header, memoized per header"""
+        header = header[:self.ACCEPT_LENGTH]
+        name: Optional[str] = self.__negotiations.get(header)
+        if name is None:
+            name = ""
+            for lrange in self.accept(header):
+                try:
+                    name = self.resolve(lrange).name
+                    break
+                except LookupError:
+                    continue
+            name = self.__negotiations.setdefault(header, name)
+        if name:
+            return self.load(self.languages[name])
+        if default is not None:
+            return self.lookup(default)
+        raise LookupError(f"No acceptable language: {header[:64]}")
+
+    def path(self, langtag: LangT) -> str:
+        """Catalog file of the resolved language tag"""
+        return self.__segments[self.resolve(langtag).name]
+
+    def catalog(self, langtag: LangT) -> CatalogT:
+        """Read-only dotted key view of the resolved catalog"""
+        path: str = self.path(langtag)
+        catalog: Optional[CatalogT] = self.__catalogs.get(path)
+        if catalog is None:
+            catalog = self.__catalogs.setdefault(path, self.__open(path), os.path.getsize(path))  # noqa:E501
+        return catalog
 
     def load(self, ltag: LangTag) -> Segment:
         path: str = self.__segments[ltag.name]
-        if path not in self.__objects:
-            segment: Segment = Segment.loadf(path)
-            self.__objects[path] = segment
-        return self.__objects[path]
+        segment: Optional[Segment] = self.__probe(path)
+        return self.__fill(path) if segment is None else segment
+
+    def __probe(self, path: str) -> Optional[Segment]:
+        """Look up the cached segment, count and emit the hit or miss"""
+        segment: Optional[Segment] = self.__objects.get(path)
+        if Observers.OBSERVERS:
+            Observers.emit("on_miss" if segment is None else "on_hit", path)
+        return segment
+
+    def __fill(self, path: str) -> Segment:
+        return self.__objects.setdefault(path, self.__reload(path), os.path.getsize(path))  # noqa:E501
+
+    async def alookup(self, langtag: LangT, executor: Optional["Executor"] = None) -> Segment:  # noqa:E501
+        return await self.aload(self.resolve(langtag), executor)
+
+    async def aload(self, ltag: LangTag, executor: Optional["Executor"] = None) -> Segment:  # noqa:E501
+        """Load segment in executor without blocking the event loop
+
+        Concurrent awaiters of the same catalog share one in-flight load,
+        the loaded segment is cached as load() does.
+        """
+        from asyncio import get_running_loop
+        from asyncio import shield
+
+        path: str = self.__segments[ltag.name]
+        segment: Optional[Segment] = self.__probe(path)
+        if segment is not None:
+            return segment
+        loop: "AbstractEventLoop" = get_running_loop()
+        key: Tuple["AbstractEventLoop", str] = (loop, path)
+        future: Optional["Future[Segment]"] = self.__inflights.get(key)
+        if future is None:
+            future = loop.run_in_executor(executor, self.__fill, path)
+            future.add_done_callback(lambda _: self.__inflights.pop(key, None))  # noqa:E501
+            self.__inflights[key] = future
+        return await shield(future)  # a cancelled awaiter leaves the load
+
+    @classmethod
+    def parse(cls, path: str) -> Tuple[Dict[str, Any], float]:
+        """Parse catalog file, return the plain data and the elapsed time"""
+        start: float = perf_counter()
+        data: Dict[str, Any] = Segment.parse(path)
+        return data, perf_counter() - start
+
+    def preload(self, tags: Optional[Iterable[LangT]] = None, workers: Optional[int] = None, executor: str = "process") -> Dict[str, float]:  # noqa:E501
+        """Parse catalogs in parallel and cache the segments
+
+        Catalog files are parsed in a process or thread pool of workers,
+        the plain data is shipped back and rebuilt into segments here.
+        All catalogs are preloaded if tags is None, loaded ones are kept.
+        Return the parse time of each preloaded file.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures import ThreadPoolExecutor
+        from concurrent.futures import as_completed
+
+        pools = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}  # noqa:E501
+        if executor not in pools:
+            raise ValueError(f"Invalid executor: {executor}")
+        paths: Set[str] = set(self.__segments.values()) if tags is None else {self.__segments[self.resolve(tag).name] for tag in tags}  # noqa:E501
+        timings: Dict[str, float] = {}
+        with pools[executor](max_workers=workers) as pool:
+            futures = {pool.submit(self.parse, path): path for path in paths if path not in self.__objects}  # noqa:E501
+            for future in as_completed(futures):
+                path: str = futures[future]
+                data, timings[path] = future.result()
+                start: float = perf_counter()
+                segment: Segment = Segment.load(Segment.filelang(path), data)
+                self.__objects.put(path, segment, os.path.getsize(path))
+                if Observers.OBSERVERS:
+                    Observers.emit("on_load", path, timings[path])
+                with self.__lock:
+                    self.__load_time += timings[path] + perf_counter() - start
+                    self.__loads += 1
+        return timings
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Modification time and size of each catalog file"""
+        signatures: Dict[str, Tuple[int, int]] = {}
+        with os.scandir(self.base) as entries:
+            for entry in entries:
+                if os.path.splitext(entry.name)[1] == self.SUFFIX and entry.is_file():  # noqa:E501
+                    stat: os.stat_result = entry.stat()
+                    signatures[entry.path] = (stat.st_mtime_ns, stat.st_size)  # noqa:E501
+        return signatures
+
+    @classmethod
+    def index(cls, paths: Iterable[str]) -> Dict[str, str]:
+        """Map language tags and their aliases to catalog files"""
+        langtags: LangTags = LangTags.shared()
+        segments: Dict[str, str] = {}
+        for path in paths:
+            key: str = os.path.splitext(os.path.basename(path))[0]
+            lang: LangItem = langtags[key]
+            for atag in lang.aliases:
+                segments.setdefault(atag, path)
+            segments[lang.name] = path
+        return segments
+
+    def refresh(self) -> Tuple[str, ...]:
+        """Reload changed catalogs and return the changed file paths
+
+        Changed segments are rebuilt before they are swapped in, so readers
+        always see either the old or the new segment and are never blocked.
+        Only loaded segments of changed files are parsed again.
+
+        A catalog that fails to load (unknown language, invalid content or
+        removed meanwhile) is logged and keeps its old segment, it is tried
+        again once the file changes, other catalogs are refreshed anyway.
+        """
+        return self.__update(strict=False)
+
+    def __update(self, strict: bool) -> Tuple[str, ...]:
+        with self.__refresh:
+            signatures: Dict[str, Tuple[int, int]] = self.scan()
+            self.__failures = {path: signature for path, signature in self.__failures.items() if path in signatures}  # noqa:E501
+            changed: List[str] = [path for path, signature in signatures.items()  # noqa:E501
+                                  if self.__signatures.get(path) != signature  # noqa:E501
+                                  and self.__failures.get(path) != signature]  # noqa:E501
+            removed: List[str] = [path for path in self.__signatures
+                                  if path not in signatures]
+            reloaded: List[str] = [path for path in changed
+                                   if self.__reload_changed(path, signatures[path], strict)]  # noqa:E501
+            for path in set(signatures) - set(self.__signatures) - set(reloaded):  # noqa:E501
+                del signatures[path]  # failed or known to fail
+            for path in set(changed) - set(reloaded):
+                if path in self.__signatures:
+                    signatures[path] = self.__signatures[path]
+            if removed or any(path not in self.__signatures for path in reloaded):  # noqa:E501
+                self.__segments = self.index(signatures)
+                for name in self.__segments:
+                    self.__languages.pin(name)
+                self.__resolutions = {}
+                self.__negotiations.clear()
+            for path in removed:
+                self.__objects.pop(path)
+                self.__catalogs.pop(path)
+            self.__signatures = signatures
+            return tuple(reloaded + removed)
+
+    def __reload_changed(self, path: str, signature: Tuple[int, int], strict: bool) -> bool:  # noqa:E501
+        """Swap in the rebuilt segment and catalog of a changed file"""
+        try:
+            Segment.filelang(path)
+            segment: Optional[Segment] = self.__reload(path) if path in self.__objects else None  # noqa:E501
+            catalog: Optional[CatalogT] = self.__open(path) if path in self.__catalogs else None  # noqa:E501
+        except Exception:  # pylint:disable=W0718
+            if strict:
+                raise
+            logger.warning("Failed to reload catalog %s", path, exc_info=True)  # noqa:E501
+            self.__failures[path] = signature
+            return False
+        if segment is not None:
+            self.__objects.put(path, segment, signature[1])
+        if catalog is not None:
+            self.__catalogs.put(path, catalog, signature[1])
+        self.__failures.pop(path, None)
+        return True
+
+    def watch(self, interval: float = 1.0) -> None:
+        """Poll the catalog files in a background thread"""
+        if self.__watcher is None:
+            self.__stopped.clear()
+            self.__watcher = Thread(target=self.__watch, args=(interval,),
+                                    name=f"xlc-watch:{self.base}", daemon=True)  # noqa:E501
+            self.__watcher.start()
+
+    def unwatch(self) -> None:
+        if self.__watcher is not None:
+            self.__stopped.set()
+            self.__watcher.join()
+            self.__watcher = None
+
+    def __watch(self, interval: float) -> None:
+        while not self.__stopped.wait(interval):
+            try:
+                self.refresh()
+            except Exception:  # pylint:disable=W0718
+                logger.exception("Failed to refresh catalogs in %s", self.base)  # noqa:E501
+
+    @classmethod
+    def compiled(cls, path: str) -> str:
+        return os.path.splitext(path)[0] + cls.COMPILED
+
+    @classmethod
+    def fresh(cls, path: str) -> bool:
+        """Whether compiled catalog is up to date with the source"""
+        try:
+            return os.stat(cls.compiled(path)).st_mtime_ns >= os.stat(path).st_mtime_ns  # noqa:E501
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def values(cls, path: str) -> Dict[str, Any]:
+        """Map full dotted keys of catalog file to values
+
+        Neither templates nor sections are built. A fresh compiled catalog
+        is read instead of parsing the source.
+        """
+        return {".".join(names): value for names, value in cls.entries(path).items()}  # noqa:E501
+
+    @classmethod
+    def entries(cls, path: str) -> Dict[Tuple[str, ...], Any]:
+        """Map key paths (section and key names) of catalog file to values
+
+        Unlike the dotted keys of values(), a name holding a dot is kept.
+        """
+        if not cls.fresh(path):
+            return dict(cls.walk(Segment.parse(path)))
+        catalog = CompiledCatalog(language=Segment.filelang(path), path=cls.compiled(path))  # noqa:E501
+        try:
+            return {catalog.parts(entry): catalog.value(entry) for entry in range(len(catalog))}  # noqa:E501
+        finally:
+            catalog.close()
+
+    @classmethod
+    def walk(cls, datas: Dict[str, Any], prefix: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], Any]]:  # noqa:E501
+        """Yield key paths of parsed catalog data and values"""
+        for k, v in datas.items():
+            if isinstance(v, dict):
+                yield from cls.walk(v, prefix + (k,))
+            else:
+                yield prefix + (k,), v
+
+    def __reload(self, path: str) -> Segment:
+        start: float = perf_counter()
+        segment: Segment = Segment.loadc(self.compiled(path)) if self.fresh(path) else Segment.loadf(path)  # noqa:E501
+        with self.__lock:
+            self.__load_time += perf_counter() - start
+            self.__loads += 1
+        return segment
+
+    def __open(self, path: str) -> CatalogT:
+        if not self.mapped:
+            return self.__reload(path).compile()
+        if not self.fresh(path):
+            self.__reload(path).dumpc(self.compiled(path))
+        return CompiledCatalog(language=Segment.filelang(path), path=self.compiled(path))  # noqa:E501
@@ -0,0 +1,165 @@
+# coding:utf-8
+
+import os
+from typing import Any
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from xlc.database.langtags import LangItem
+from xlc.database.langtags import LangT
+from xlc.language.message import Message
+from xlc.language.segment import Segment
+from xlc.language.template import Template
+
+FieldsT = Optional[FrozenSet[str]]  # None if the value is an invalid template
+NOFIELDS: FrozenSet[str] = frozenset()
+
+
+class LocaleReport(NamedTuple):
+    """Coverage and placeholder consistency of a catalog"""
+    language: str
+    path: str
+    total: int  # keys of the reference
+    missing: Tuple[str, ...]  # keys only in the reference
+    obsolete: Tuple[str, ...]  # keys not in the reference
+    invalid: Tuple[str, ...]  # values failing to parse as templates
+    mismatches: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]]  # key: (reference, locale) placeholders  # noqa:E501
+    error: str = ""  # why the catalog could not be compared
+
+    @property
+    def coverage(self) -> float:
+        if self.error:
+            return 0.0
+        return (self.total - len(self.missing)) / self.total if self.total else 1.0  # noqa:E501
+
+    @property
+    def passed(self) -> bool:
+        return not (self.error or self.missing or self.invalid or self.mismatches)  # noqa:E501
+
+    def dump(self) -> Dict[str, Any]:
+        """Plain (JSON serializable) report"""
+        return {
+            "language": self.language,
+            "path": self.path,
+            "total": self.total,
+            "coverage": self.coverage,
+            "missing": list(self.missing),
+            "obsolete": list(self.obsolete),
+            "invalid": list(self.invalid),
+            "mismatches": {key: {"reference": sorted(expected), "locale": sorted(actual)}  # noqa:E501
+                           for key, (expected, actual) in self.mismatches.items()},  # noqa:E501
+            "error": self.error,
+        }
+
+
+class Report():
+    """Compare catalogs of a directory with a reference language
+
+    The reference is flattened once to dotted keys and their placeholder
+    names. Other catalogs are loaded one at a time and dropped after the
+    comparison, nothing is kept in the Message cache, so memory is bound
+    by the reference and the largest catalog.
+
+    A catalog that cannot be compared (unknown language, invalid content
+    or removed meanwhile) fails with its error instead of the whole run.
+    """
+
+    def __init__(self, message: Message, reference: LangT = "en"):
+        self.__message: Message = message
+        self.__path: str = message.path(reference)
+        self.__reference: LangItem = Segment.filelang(self.__path)
+        self.__fields: Dict[str, FieldsT] = self.extract(self.__path)
+
+    @property
+    def message(self) -> Message:
+        return self.__message
+
+    @property
+    def reference(self) -> LangItem:
+        return self.__reference
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def fields(self) -> Dict[str, FieldsT]:
+        """Placeholder names of each dotted key of the reference"""
+        return self.__fields
+
+    def locales(self, langtags: Optional[Iterable[LangT]] = None) -> Iterator[LocaleReport]:  # noqa:E501
+        """Yield reports of the catalogs, all but the reference by default"""
+        paths: List[str] = sorted(self.message.scan()) if langtags is None else [self.message.path(langtag) for langtag in langtags]  # noqa:E501
+        for path in paths:
+            if path != self.path:
+                try:
+                    yield self.compare(path)
+                except (KeyError, OSError, ValueError) as error:
+                    yield self.failed(path, error)
+
+    def compare(self, path: str) -> LocaleReport:
+        fields: Dict[str, FieldsT] = self.extract(path)
+        reference: Dict[str, FieldsT] = self.__fields
+        common = fields.keys() & reference.keys()
+        return LocaleReport(
+            language=Segment.filelang(path).name,
+            path=path,
+            total=len(reference),
+            missing=tuple(sorted(reference.keys() - fields.keys())),
+            obsolete=tuple(sorted(fields.keys() - reference.keys())),
+            invalid=tuple(sorted(k for k in common if fields[k] is None)),
+            mismatches={k: (reference[k], fields[k]) for k in sorted(common)
+                        if reference[k] is not None and fields[k] is not None and fields[k] != reference[k]},  # noqa:E501
+        )
+
+    def failed(self, path: str, error: Exception) -> LocaleReport:
+        """Report of a catalog that could not be compared"""
+        return LocaleReport(
+            language=os.path.basename(path).partition(".")[0],
+            path=path,
+            total=len(self.__fields),
+            missing=(),
+            obsolete=(),
+            invalid=(),
+            mismatches={},
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    @classmethod
+    def extract(cls, path: str) -> Dict[str, FieldsT]:
+        """Map dotted keys of catalog file to placeholder names
+
+        Catalogs are not loaded as segments, so invalid templates are
+        reported rather than failing the load.
+        """
+        return {k: cls.placeholders(v) for k, v in Message.values(path).items()
+                if k.rpartition(".")[2] != "language"}
+
+    @classmethod
+    def placeholders(cls, value: Any) -> FieldsT:
+        if not Template.need(value):
+            return NOFIELDS
+        try:
+            return Template(value).fields
+        except ValueError:
+            return None
+
+    @classmethod
+    def text(cls, report: LocaleReport) -> Iterator[str]:
+        """Human readable lines of a report"""
+        if report.error:
+            yield f"{report.language}: {report.error}"
+            return
+        yield f"{report.language}: {report.coverage:.1%} of {report.total} keys, {len(report.missing)} missing, {len(report.obsolete)} obsolete, {len(report.invalid)} invalid, {len(report.mismatches)} mismatched"  # noqa:E501
+        for key in report.missing:
+            yield f"  missing {key}"
+        for key in report.invalid:
+            yield f"  invalid {key}"
+        for key, (expected, actual) in report.mismatches.items():
+            yield f"  mismatch {key}: {{{', '.join(sorted(expected))}}} != {{{', '.join(sorted(actual))}}}"  # noqa:E501
@@ -0,0 +1,254 @@
+# coding:utf-8
+
+from array import array
+from logging import getLogger
+import mmap
+import os
+from struct import Struct
+import sys
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from zlib import crc32
+
+from xlc.atomic import AtomicFile
+from xlc.database.langtags import LangT
+from xlc.language.message import Message
+from xlc.language.segment import Segment
+
+logger = getLogger(__name__)
+
+
+class Shard():
+    """Memory-mapped trigram index of the string values of a catalog
+
+    The file layout is:
+        header        = magic version count slots postings
+        entries       = count(key length value length)
+        slots         = slots(gram length start count)  ; open addressing
+        postings      = postings(number)    ; ascending entries per gram
+        strings       = *OCTET              ; UTF-8 keys, casefolded values
+                                            ; and trigrams
+
+    Trigrams are hashed with CRC-32 into a power-of-two slot table that is
+    at most half full, a slot with no postings is empty. Opening a shard
+    reads nothing but the header, pages are loaded as queries touch them.
+    """
+    MAGIC: bytes = b"XLCI"
+    VERSION: int = 1
+    HEADER: Struct = Struct("<4sHIII")
+    ENTRY: Struct = Struct("<IIII")
+    SLOT: Struct = Struct("<IBII")
+    NUMBER: Struct = Struct("<I")
+
+    def __init__(self, language: str, path: str):
+        with open(path, "rb") as rhdl:
+            self.__mmap: mmap.mmap = mmap.mmap(rhdl.fileno(), 0, access=mmap.ACCESS_READ)  # noqa:E501
+        magic, version, count, slots, postings = self.HEADER.unpack_from(self.__mmap, 0)  # noqa:E501
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a version {self.VERSION} search index")  # noqa:E501
+        self.__entries: int = self.HEADER.size
+        self.__slots: int = self.__entries + count * self.ENTRY.size
+        self.__postings: int = self.__slots + slots * self.SLOT.size
+        self.__strings: int = self.__postings + postings * self.NUMBER.size
+        self.__language: str = language
+        self.__count: int = count
+        self.__mask: int = slots - 1
+
+    def __len__(self) -> int:
+        return self.__count
+
+    @property
+    def language(self) -> str:
+        return self.__language
+
+    def find(self, gram: str) -> Tuple[int, int]:
+        """Probe the hash index, return start and count of the postings"""
+        key: bytes = gram.encode("utf-8")
+        slot: int = crc32(key) & self.__mask
+        while True:
+            offset, length, start, count = self.SLOT.unpack_from(self.__mmap, self.__slots + slot * self.SLOT.size)  # noqa:E501
+            if count == 0:
+                return 0, 0
+            begin: int = self.__strings + offset
+            if self.__mmap[begin:begin + length] == key:
+                return start, count
+            slot = (slot + 1) & self.__mask
+
+    def postings(self, start: int, count: int) -> array:
+        begin: int = self.__postings + start * self.NUMBER.size
+        numbers: array = array("I")
+        numbers.frombytes(self.__mmap[begin:begin + count * self.NUMBER.size])  # noqa:E501
+        if sys.byteorder != "little":  # pragma: no cover
+            numbers.byteswap()
+        return numbers
+
+    def search(self, text: str) -> List[str]:
+        """Keys of values containing casefolded text"""
+        candidates: Iterable[int] = range(self.__count)
+        fewest: Optional[Tuple[int, int]] = None
+        for gram in SearchIndex.trigrams(text):
+            start, count = self.find(gram)
+            if count == 0:
+                return []
+            if fewest is None or count < fewest[1]:
+                fewest = (start, count)
+        if fewest is not None:
+            # candidates of the rarest trigram are verified, not intersected
+            candidates = self.postings(*fewest)
+        needle: bytes = text.encode("utf-8")
+        strings: int = self.__strings
+        keys: List[str] = []
+        for entry in candidates:
+            koffset, klength, voffset, vlength = self.ENTRY.unpack_from(self.__mmap, self.__entries + entry * self.ENTRY.size)  # noqa:E501
+            if self.__mmap.find(needle, strings + voffset, strings + voffset + vlength) >= 0:  # noqa:E501
+                keys.append(self.__mmap[strings + koffset:strings + koffset + klength].decode("utf-8"))  # noqa:E501
+        return keys
+
+    def close(self) -> None:
+        self.__mmap.close()
+
+    @classmethod
+    def dumps(cls, values: Mapping[str, str]) -> bytes:
+        """Index casefolded values by dotted key"""
+        entries: bytearray = bytearray()
+        strings: bytearray = bytearray()
+        grams: Dict[str, List[int]] = {}
+        for entry, (index, value) in enumerate(values.items()):
+            key: bytes = index.encode("utf-8")
+            data: bytes = value.encode("utf-8")
+            entries += cls.ENTRY.pack(len(strings), len(key), len(strings) + len(key), len(data))  # noqa:E501
+            strings += key + data
+            for gram in SearchIndex.trigrams(value):
+                grams.setdefault(gram, []).append(entry)
+        slots: int = 1
+        while slots < len(grams) * 2:
+            slots *= 2
+        table: List[bytes] = [cls.SLOT.pack(0, 0, 0, 0)] * slots
+        postings: array = array("I")
+        for gram, numbers in grams.items():
+            key = gram.encode("utf-8")
+            slot: int = crc32(key) & (slots - 1)
+            while table[slot][-4:] != b"\0\0\0\0":
+                slot = (slot + 1) & (slots - 1)
+            table[slot] = cls.SLOT.pack(len(strings), len(key), len(postings), len(numbers))  # noqa:E501
+            strings += key
+            postings.extend(numbers)
+        if sys.byteorder != "little":  # pragma: no cover
+            postings.byteswap()
+        header: bytes = cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(values), slots, len(postings))  # noqa:E501
+        return header + entries + b"".join(table) + postings.tobytes() + strings  # noqa:E501
+
+    @classmethod
+    def dump(cls, path: str, values: Mapping[str, str]) -> None:
+        with AtomicFile(path) as whdl:
+            whdl.write(cls.dumps(values))
+
+
+class SearchIndex():
+    """Substring search over the values of catalogs in a directory
+
+    Each catalog has a memory-mapped trigram index shard next to it
+    (.xlci). A query looks up the posting list of its rarest trigram per
+    shard and verifies only those candidates, queries shorter than three
+    characters scan the values. Matching is case-insensitive (casefold).
+
+    Shards are opened or built at initialization, call update() to pick
+    up changed, added and removed catalogs, only changed ones are built
+    again. A shard file is used while it is not older than its catalog.
+    A catalog that cannot be indexed (unknown language or invalid content)
+    is logged and skipped like Message.refresh() does, it is tried again
+    once the file changes.
+    """
+    SUFFIX: str = ".xlci"
+
+    def __init__(self, message: Message):
+        self.__message: Message = message
+        self.__shards: Dict[str, Shard] = {}
+        self.__signatures: Dict[str, Tuple[int, int]] = {}
+        self.__failures: Dict[str, Tuple[int, int]] = {}  # signatures failed to index  # noqa:E501
+        self.update()
+
+    def __len__(self) -> int:
+        return len(self.__shards)
+
+    @property
+    def message(self) -> Message:
+        return self.__message
+
+    def update(self) -> Tuple[str, ...]:
+        """Build or open shards of changed catalogs, return their paths"""
+        signatures: Dict[str, Tuple[int, int]] = self.message.scan()
+        self.__failures = {path: signature for path, signature in self.__failures.items() if path in signatures}  # noqa:E501
+        changed: List[str] = [path for path, signature in signatures.items()
+                              if self.__signatures.get(path) != signature
+                              and self.__failures.get(path) != signature]
+        removed: List[str] = [path for path in self.__signatures
+                              if path not in signatures]
+        for path in list(changed):
+            try:
+                self.__shards[path] = self.load(path)
+                self.__failures.pop(path, None)
+            except Exception:  # pylint:disable=W0718
+                logger.warning("Failed to index catalog %s", path, exc_info=True)  # noqa:E501
+                self.__failures[path] = signatures[path]
+                changed.remove(path)
+        for path in set(signatures) - set(self.__shards):
+            del signatures[path]  # failed or known to fail
+        for path in set(self.__failures) & set(self.__signatures):
+            signatures[path] = self.__signatures[path]  # keep the old shard
+        for path in removed:
+            del self.__shards[path]
+            if os.path.exists(shard := self.sharded(path)):
+                os.remove(shard)
+        self.__signatures = signatures
+        return tuple(changed + removed)
+
+    def search(self, text: str, langtags: Optional[Iterable[LangT]] = None) -> List[Tuple[str, str]]:  # noqa:E501
+        """Language and dotted key of values containing text"""
+        text = text.casefold()
+        paths: Iterable[str] = sorted(self.__shards) if langtags is None else [self.message.path(langtag) for langtag in langtags]  # noqa:E501
+        results: List[Tuple[str, str]] = []
+        for path in paths:
+            if (shard := self.__shards.get(path)) is None:
+                raise LookupError(f"{path} is not indexed, call update() first")  # noqa:E501
+            results.extend((shard.language, key) for key in shard.search(text))  # noqa:E501
+        return results
+
+    @classmethod
+    def trigrams(cls, text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    @classmethod
+    def values(cls, path: str) -> Dict[str, str]:
+        """Casefolded string values of catalog file"""
+        return {k: v.casefold() for k, v in Message.values(path).items()
+                if isinstance(v, str) and k.rpartition(".")[2] != "language"}  # noqa:E501
+
+    @classmethod
+    def sharded(cls, path: str) -> str:
+        return os.path.splitext(path)[0] + cls.SUFFIX
+
+    @classmethod
+    def fresh(cls, path: str) -> bool:
+        """Whether shard file is up to date with the catalog"""
+        try:
+            return os.stat(cls.sharded(path)).st_mtime_ns >= os.stat(path).st_mtime_ns  # noqa:E501
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def load(cls, path: str) -> Shard:
+        """Open the shard of catalog, build a stale or unreadable one"""
+        language: str = Segment.filelang(path).name
+        if cls.fresh(path):
+            try:
+                return Shard(language=language, path=cls.sharded(path))
+            except ValueError:  # another version, build it again
+                pass
+        Shard.dump(cls.sharded(path), cls.values(path))
+        return Shard(language=language, path=cls.sharded(path))
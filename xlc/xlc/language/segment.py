@@ -1,39 +1,96 @@
 # coding:utf-8
 
+from hashlib import sha256
 import os
+from time import perf_counter
+from types import MappingProxyType
 from typing import Any
 from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from typing import Union
 
-from toml import dumps
-from toml import loads
-
+from xlc.atomic import AtomicFile
 from xlc.database.langtags import LangItem
 from xlc.database.langtags import LangT
 from xlc.database.langtags import LangTags
+from xlc.language.catalog import Catalog
+from xlc.language.catalog import CompiledCatalog
+from xlc.language.template import Template
+from xlc.observer import Observers
+
+
+EMPTY: Mapping[str, Any] = MappingProxyType({})  # shared until first insert
 
 
 class Context():
+    __slots__ = ("__datas", "__templates")
+
     def __init__(self, language: str):
         self.__datas: Dict[str, Any] = {"language": language}
+        self.__templates: Mapping[str, Template] = EMPTY
 
     def get(self, index: str) -> Any:
         return self.__datas[index]
 
     def set(self, index: str, value: Any):
+        """Set value, placeholders in strings are parsed and validated
+
+        An invalid template is kept as a plain string and only fails when
+        it is rendered, so that one bad value does not fail the catalog.
+        """
+        template: Optional[Template] = self.prepare(value)
+        if template is not None:
+            if self.__templates is EMPTY:
+                self.__templates = {}
+            self.__templates[index] = template  # type:ignore
+        elif index in self.__templates:
+            del self.__templates[index]  # type:ignore
         self.__datas[index] = value
 
     def all(self) -> Dict[str, Any]:
         return {k: v for k, v in self.__datas.items()}
 
+    def render(self, index: str, **kwargs: Any) -> str:
+        """Render a single value with precompiled template"""
+        if (template := self.__templates.get(index)) is not None:
+            return template.render(**kwargs)
+        value: Any = self.__datas[index]
+        if Template.need(value):
+            Template(value)  # invalid template, raise the parse error
+        return value if isinstance(value, str) else str(value)
+
+    @classmethod
+    def prepare(cls, value: Any) -> Optional[Template]:
+        """Template of value, None if there is nothing to parse or invalid"""
+        if not Template.need(value):
+            return None
+        try:
+            return Template(value)
+        except ValueError:
+            return None
+
     def fill(self, **kwargs: Any) -> Dict[str, str]:
-        return {k: v.format(**kwargs) if isinstance(v, str) else str(v)
-                for k, v in self.__datas.items()}
+        datas: Dict[str, str] = {}
+        for k in self.__datas:
+            try:
+                datas[k] = self.render(k, **kwargs)
+            except (AttributeError, IndexError, KeyError, ValueError) as error:  # noqa:E501
+                if Observers.OBSERVERS:
+                    Observers.emit("on_format_error", self.__datas["language"], k, error)  # noqa:E501
+                raise
+        return datas
 
 
 class Section(Context):
+    __slots__ = ("__sections", "__language", "__title")
+
     def __init__(self, language: LangItem, title: str = ""):
         super().__init__(language.name)
-        self.__sections: Dict[str, Section] = {}
+        self.__sections: Mapping[str, Section] = EMPTY
         self.__language: LangItem = language
         self.__title: str = title
 
@@ -44,11 +101,25 @@ class Section(Context):
     def init(self, index: str, value: Any):
         if isinstance(value, dict):
             for k, v in value.items():
-                self.seek(index).init(k, v)
+                self.create(index).init(k, v)
         else:
             self.set(index, value)
 
     def seek(self, index: str) -> "Section":
+        if Observers.OBSERVERS and not self.exists(index):
+            Observers.emit("on_missing_key", self.lang.name, f"{self.__title}.{index}".lstrip("."))  # noqa:E501
+        return self.create(index)
+
+    def exists(self, index: str) -> bool:
+        section: Section = self
+        for key in index.split("."):
+            if key not in section.__sections:
+                return False
+            section = section.__sections[key]
+        return True
+
+    def create(self, index: str) -> "Section":
+        """Seek section, missing ones are created silently"""
         section: Section = self
         for key in index.split("."):
             section = section.find(key)
@@ -58,7 +129,9 @@ class Section(Context):
         if index not in self.__sections:
             title: str = ".".join([self.__title, index])
             section = Section(language=self.lang, title=title)
-            self.__sections.setdefault(index, section)
+            if self.__sections is EMPTY:
+                self.__sections = {}
+            self.__sections.setdefault(index, section)  # type:ignore
         return self.__sections[index]
 
     def dump(self) -> Dict[str, Dict[str, Any]]:
@@ -67,17 +140,103 @@ class Section(Context):
             datas[k] = v.dump()
         return datas
 
+    def flatten(self, prefix: str = "") -> Dict[str, Any]:
+        """Map full dotted keys to values"""
+        datas: Dict[str, Any] = {prefix + k: v for k, v in self.all().items()}
+        for k, v in self.__sections.items():
+            datas.update(v.flatten(f"{prefix}{k}."))
+        return datas
+
+    def walk(self, prefix: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], Any]]:  # noqa:E501
+        """Yield key paths (section and key names) and values"""
+        for k, v in self.all().items():
+            yield prefix + (k,), v
+        for k, s in self.__sections.items():
+            yield from s.walk(prefix + (k,))
+
+    def stream(self) -> Iterator[str]:
+        """Yield TOML text table by table, in the order of toml.dumps()
+
+        Tables are written breadth first, only one level of the tree is
+        pending at a time and no document is built in memory.
+        """
+        from toml import TomlEncoder
+
+        encoder: TomlEncoder = TomlEncoder()
+        tail: str = ""
+        level: List[Tuple[str, Union[Section, Dict[str, Any]]]] = [("", self)]
+        while level:
+            pending: List[Tuple[str, Union[Section, Dict[str, Any]]]] = []
+            for title, node in level:
+                datas: Dict[str, Any] = node.all() if isinstance(node, Section) else node  # noqa:E501
+                scalars, tables = encoder.dump_sections(datas, title)
+                children = [(f"{title}.{k}".lstrip("."), v) for k, v in tables.items()]  # noqa:E501
+                if isinstance(node, Section):
+                    children.extend((f"{title}.{self.quote(k)}".lstrip("."), v) for k, v in node.__sections.items())  # noqa:E501
+                if title and (scalars or not children):
+                    blank: str = "\n" if tail and tail != "\n\n" else ""
+                    scalars = f"{blank}[{title}]\n{scalars}"
+                if scalars:
+                    tail = scalars[-2:]
+                    yield scalars
+                pending.extend(children)
+            level = pending
+
+    @classmethod
+    def quote(cls, key: str) -> str:
+        """Bare TOML key or quoted string"""
+        if key and all(c.isascii() and (c.isalnum() or c in "_-") for c in key):  # noqa:E501
+            return key
+        from toml import TomlEncoder
+
+        return TomlEncoder().dump_value(key)
+
 
 class Segment(Section):
+    __slots__ = ()
+
     def __init__(self, language: LangItem):
         super().__init__(language=language)
 
+    def compile(self) -> Catalog:
+        """Read-only flattened view for dotted key lookups"""
+        return Catalog(language=self.lang, datas=self.flatten())
+
     def dumps(self) -> str:
-        return dumps(self.dump())
+        return "".join(self.stream())
+
+    def dumpf(self, file: str) -> bool:
+        """Write atomically, return False if the content is unchanged
 
-    def dumpf(self, file: str) -> None:
-        with open(file, "w", encoding="utf-8") as whdl:
-            whdl.write(self.dumps())
+        The catalog is streamed into a temporary file, which replaces the
+        target only if their digests differ, so unchanged files keep the
+        modification time that caches and Message.refresh() rely on.
+        """
+        digest = sha256()
+        with AtomicFile(file) as whdl:
+            for text in self.stream():
+                data: bytes = text.encode("utf-8")
+                digest.update(data)
+                whdl.write(data)
+            if self.digest(file) == digest.digest():
+                whdl.discard()
+        return not whdl.discarded
+
+    @classmethod
+    def digest(cls, file: str) -> Optional[bytes]:
+        """SHA-256 of the file content, None if it does not exist"""
+        digest = sha256()
+        try:
+            with open(file, "rb") as rhdl:
+                while chunk := rhdl.read(65536):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            return None
+        return digest.digest()
+
+    def dumpc(self, file: str) -> None:
+        """Write compiled catalog (.xlcc)"""
+        CompiledCatalog.dump(file, self.walk())
 
     @classmethod
     def load(cls, lang: LangItem, data: Dict[str, Any]) -> "Segment":
@@ -88,18 +247,52 @@ class Segment(Section):
 
     @classmethod
     def loads(cls, lang: LangItem, data: str) -> "Segment":
+        from toml import loads
+
         return cls.load(lang=lang, data=loads(data))
 
     @classmethod
-    def loadf(cls, file: str) -> "Segment":
+    def parse(cls, file: str) -> Dict[str, Any]:
+        """Parse catalog file into plain (picklable) data"""
+        from toml import loads
+
         with open(file, "r", encoding="utf-8") as rhdl:
-            langtags: LangTags = LangTags.from_config()
-            base: str = os.path.basename(file)
-            ltag: str = base[:base.find(".")]
-            data: str = rhdl.read()
-            return cls.loads(lang=langtags[ltag], data=data)
+            return loads(rhdl.read())
+
+    @classmethod
+    def loadf(cls, file: str) -> "Segment":
+        start: float = perf_counter()
+        instance: Segment = cls.load(lang=cls.filelang(file), data=cls.parse(file))  # noqa:E501
+        if Observers.OBSERVERS:
+            Observers.emit("on_load", file, perf_counter() - start)
+        return instance
+
+    @classmethod
+    def loadc(cls, file: str) -> "Segment":
+        """Load compiled catalog (.xlcc) without parsing TOML"""
+        start: float = perf_counter()
+        catalog = CompiledCatalog(language=cls.filelang(file), path=file)
+        try:
+            instance: Segment = cls(catalog.lang)
+            for entry in range(len(catalog)):
+                *sections, index = catalog.parts(entry)
+                section: Section = instance
+                for name in sections:
+                    section = section.find(name)
+                section.set(index, catalog.value(entry))
+        finally:
+            catalog.close()
+        if Observers.OBSERVERS:
+            Observers.emit("on_load", file, perf_counter() - start)
+        return instance
+
+    @classmethod
+    def filelang(cls, file: str) -> LangItem:
+        """Language of catalog file named like zh-Hans.xlc"""
+        base: str = os.path.basename(file)
+        return LangTags.shared()[base[:base.find(".")]]
 
     @classmethod
     def generate(cls, langtag: LangT) -> "Segment":
-        lang: LangItem = LangTags.from_config()[langtag]
+        lang: LangItem = LangTags.shared()[langtag]
         return Segment.load(lang, {})
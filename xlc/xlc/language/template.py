@@ -0,0 +1,94 @@
+# coding:utf-8
+
+from string import Formatter
+from sys import intern
+from typing import Any
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+
+class Template():
+    """Format string parsed once for keyword rendering
+
+    Placeholders must be named, e.g. "Hello {name}". Plain placeholders
+    are rendered by joining the pre-parsed pieces, others (attributes,
+    indexes, conversions or format specs) fall back to str.format_map().
+    """
+    __slots__ = ("__pieces", "__fields", "__text")
+    FORMATTER: Formatter = Formatter()
+    FIELDS: Dict[FrozenSet[str], FrozenSet[str]] = {}  # shared placeholder sets  # noqa:E501
+    MAXFIELDS: int = 4096
+
+    def __init__(self, text: str):
+        pieces: List[str] = []
+        fields: Set[str] = set()
+        simple: bool = True
+        literals: str = ""  # escaped braces split the literal text
+        for literal, field, spec, conversion in self.parse(text):
+            literals += literal
+            if field is None:
+                continue
+            pieces.append(literals)
+            literals = ""
+            fields.add(name := intern(self.name(text, field)))
+            if spec or conversion or name != field:
+                fields.update(self.name(text, nested) for _, nested, _, _ in self.parse(spec or "") if nested is not None)  # noqa:E501
+                simple = False
+            pieces.append(name)
+        if literals:
+            pieces.append(literals)
+        # literal, name, literal, name, ..., and the trailing literal if any
+        self.__pieces: Optional[Tuple[str, ...]] = tuple(pieces) if simple else None  # noqa:E501
+        self.__fields: FrozenSet[str] = self.share(frozenset(fields))
+        self.__text: str = text
+
+    def __str__(self) -> str:
+        return self.__text
+
+    @property
+    def text(self) -> str:
+        return self.__text
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        """Placeholder names"""
+        return self.__fields
+
+    def render(self, **kwargs: Any) -> str:
+        pieces: Optional[Tuple[str, ...]] = self.__pieces
+        if pieces is None:
+            return self.__text.format_map(kwargs)
+        items: Iterator[str] = iter(pieces)
+        text: str = "".join([literal + format(kwargs[name]) for literal, name in zip(items, items)])  # noqa:E501
+        return text + pieces[-1] if len(pieces) % 2 else text
+
+    @classmethod
+    def share(cls, fields: FrozenSet[str]) -> FrozenSet[str]:
+        """Reuse an equal placeholder set, templates repeat a few of them"""
+        if len(cls.FIELDS) >= cls.MAXFIELDS:
+            cls.FIELDS.clear()
+        return cls.FIELDS.setdefault(fields, fields)
+
+    @classmethod
+    def parse(cls, text: str) -> List[Tuple[str, Optional[str], Optional[str], Optional[str]]]:  # noqa:E501
+        try:
+            return list(cls.FORMATTER.parse(text))
+        except ValueError as e:
+            raise ValueError(f"Invalid template {text!r}: {e}") from e
+
+    @classmethod
+    def name(cls, text: str, field: str) -> str:
+        name: str = field.split(".", 1)[0].split("[", 1)[0]
+        if not name.isidentifier():
+            raise ValueError(f"Invalid placeholder {{{field}}} in {text!r}")
+        return name
+
+    @classmethod
+    def need(cls, value: Any) -> bool:
+        """Whether value must be parsed before rendering"""
+        return isinstance(value, str) and ("{" in value or "}" in value)
@@ -0,0 +1,29 @@
+# coding:utf-8
+
+from importlib import import_module
+import sys
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+
+def attach(module: str, attributes: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:  # noqa:E501
+    """Module __getattr__ and __dir__ importing attributes on first access
+
+    attributes maps each name to the module that defines it (PEP 562),
+    an imported attribute is set on the module so it is looked up once.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(f"module {module!r} has no attribute {name!r}")  # noqa:E501
+        value: Any = getattr(import_module(attributes[name]), name)
+        setattr(sys.modules[module], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[module])) | set(attributes))
+
+    return __getattr__, __dir__
@@ -0,0 +1,126 @@
+# coding:utf-8
+
+from collections import Counter
+from threading import Lock
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+
+class Observer():
+    """Instrumentation events, override the ones of interest
+
+    Events are only emitted while the observer is registered, callers
+    check Observers.OBSERVERS first so there is no cost otherwise.
+    """
+
+    def on_load(self, path: str, seconds: float) -> None:
+        """Catalog file loaded (parsed or read compiled)"""
+
+    def on_hit(self, path: str) -> None:
+        """Loaded segment served from the cache"""
+
+    def on_miss(self, path: str) -> None:
+        """Segment not cached, the catalog file is loaded"""
+
+    def on_resolve(self, langtag: str, resolved: Optional[str], depth: int) -> None:  # noqa:E501
+        """Language tag resolved, depth 0 is an exact match, greater ones
+        are fallbacks through LangTag.tags, resolved is None if missing"""
+
+    def on_missing_key(self, language: str, index: str) -> None:
+        """Section.seek() created a section that did not exist"""
+
+    def on_format_error(self, language: str, index: str, error: Exception) -> None:  # noqa:E501
+        """Context.fill() failed to render a value"""
+
+
+class Observers():
+    """Registry of observers"""
+    OBSERVERS: Tuple[Observer, ...] = ()
+    LOCK: Lock = Lock()
+
+    @classmethod
+    def register(cls, observer: Observer) -> Observer:
+        with cls.LOCK:
+            if observer not in cls.OBSERVERS:
+                cls.OBSERVERS += (observer,)
+        return observer
+
+    @classmethod
+    def unregister(cls, observer: Observer) -> None:
+        with cls.LOCK:
+            cls.OBSERVERS = tuple(o for o in cls.OBSERVERS if o is not observer)  # noqa:E501
+
+    @classmethod
+    def emit(cls, event: str, *args: Any) -> None:
+        for observer in cls.OBSERVERS:
+            getattr(observer, event)(*args)
+
+
+class Collector(Observer):
+    """In-memory counters of all events"""
+
+    def __init__(self):
+        self.__lock: Lock = Lock()
+        self.__loads: Dict[str, Tuple[int, float]] = {}
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__depths: Counter = Counter()
+        self.__missing_tags: Counter = Counter()
+        self.__missing_keys: Counter = Counter()
+        self.__format_errors: Counter = Counter()
+
+    def on_load(self, path: str, seconds: float) -> None:
+        with self.__lock:
+            count, total = self.__loads.get(path, (0, 0.0))
+            self.__loads[path] = (count + 1, total + seconds)
+
+    def on_hit(self, path: str) -> None:
+        with self.__lock:
+            self.__hits += 1
+
+    def on_miss(self, path: str) -> None:
+        with self.__lock:
+            self.__misses += 1
+
+    def on_resolve(self, langtag: str, resolved: Optional[str], depth: int) -> None:  # noqa:E501
+        with self.__lock:
+            if resolved is None:
+                self.__missing_tags[langtag] += 1
+            else:
+                self.__depths[depth] += 1
+
+    def on_missing_key(self, language: str, index: str) -> None:
+        with self.__lock:
+            self.__missing_keys[f"{language}:{index}"] += 1
+
+    def on_format_error(self, language: str, index: str, error: Exception) -> None:  # noqa:E501
+        with self.__lock:
+            self.__format_errors[f"{language}:{index}"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Plain (JSON serializable) snapshot of the counters"""
+        with self.__lock:
+            return {
+                "loads": {path: {"count": count, "seconds": total}
+                          for path, (count, total) in self.__loads.items()},  # noqa:E501
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "resolutions": sum(self.__depths.values()),
+                "fallbacks": sum(n for depth, n in self.__depths.items() if depth > 0),  # noqa:E501
+                "fallback_depths": {str(depth): n for depth, n in sorted(self.__depths.items())},  # noqa:E501
+                "missing_tags": dict(self.__missing_tags),
+                "missing_keys": dict(self.__missing_keys),
+                "format_errors": dict(self.__format_errors),
+            }
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__loads.clear()
+            self.__hits = 0
+            self.__misses = 0
+            self.__depths.clear()
+            self.__missing_tags.clear()
+            self.__missing_keys.clear()
+            self.__format_errors.clear()
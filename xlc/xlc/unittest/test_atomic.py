@@ -0,0 +1,87 @@
+# coding:utf-8
+
+import os
+import stat
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+from xlc.atomic import AtomicFile
+
+
+class TestAtomicFile(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.path: str = os.path.join(self.tempdir.name, "file")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as rhdl:
+            return rhdl.read()
+
+    def mode(self) -> int:
+        return stat.S_IMODE(os.stat(self.path).st_mode)
+
+    def test_write(self):
+        umask: int = os.umask(0o027)
+        try:
+            with AtomicFile(self.path) as whdl:
+                whdl.write(b"new")
+                self.assertFalse(os.path.exists(self.path))
+        finally:
+            os.umask(umask)
+        self.assertEqual(whdl.path, self.path)
+        self.assertFalse(whdl.discarded)
+        self.assertEqual(self.read(), b"new")
+        self.assertEqual(self.mode(), 0o640)
+
+    def test_keep_mode(self):
+        with open(self.path, "wb") as whdl:
+            whdl.write(b"old")
+        os.chmod(self.path, 0o600)
+        with AtomicFile(self.path) as atomic:
+            atomic.write(b"new")
+        self.assertEqual(self.read(), b"new")
+        self.assertEqual(self.mode(), 0o600)
+
+    def test_fsync(self):
+        with mock.patch("os.fsync") as fsync:
+            with AtomicFile(self.path) as whdl:
+                whdl.write(b"new")
+                self.assertEqual(fsync.call_count, 0)
+        self.assertEqual(fsync.call_count, 2)  # the file and the directory
+        self.assertEqual(self.read(), b"new")
+
+    def test_discard(self):
+        with AtomicFile(self.path) as whdl:
+            whdl.write(b"new")
+            whdl.discard()
+        self.assertTrue(whdl.discarded)
+        self.assertEqual(os.listdir(self.tempdir.name), [])
+
+    def test_failed(self):
+        with self.assertRaises(RuntimeError):
+            with AtomicFile(self.path) as whdl:
+                whdl.write(b"new")
+                raise RuntimeError()
+        with mock.patch("os.replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                with AtomicFile(self.path) as whdl:
+                    whdl.write(b"new")
+        self.assertEqual(os.listdir(self.tempdir.name), [])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# coding:utf-8
+
+from unittest import TestCase
+from unittest import main
+
+from xlc.cache import LRUCache
+
+
+class TestLRUCache(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.cache: LRUCache[str, int] = LRUCache(maxsize=2)
+
+    def tearDown(self):
+        pass
+
+    def test_get_and_put(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.put("a", 1), 1)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("b", 2), 2)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertIn("a", self.cache)
+        self.assertEqual(list(self.cache), ["a"])
+
+    def test_setdefault(self):
+        self.assertEqual(self.cache.setdefault("a", 1), 1)
+        self.assertEqual(self.cache.setdefault("a", 2), 1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_evict(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.get("a")
+        self.cache.setdefault("c", 3)
+        self.assertEqual(list(self.cache), ["a", "c"])
+        self.assertEqual(self.cache.evictions, 1)
+        self.cache.maxsize = 1
+        self.assertEqual(self.cache.maxsize, 1)
+        self.assertEqual(list(self.cache), ["c"])
+        self.assertEqual(self.cache.evictions, 2)
+
+    def test_pop_and_clear(self):
+        self.cache.put("a", 1)
+        self.cache.get("a")
+        self.assertEqual(self.cache.pop("a"), 1)
+        self.assertIsNone(self.cache.pop("a"))
+        self.cache.put("b", 2)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
+        self.assertEqual(self.cache.evictions, 0)
+
+    def test_weight(self):
+        cache: LRUCache[str, int] = LRUCache(maxweight=10)
+        cache.put("a", 1, weight=4)
+        cache.put("b", 2, weight=4)
+        cache.put("a", 1, weight=5)
+        self.assertEqual(cache.weight, 9)
+        cache.setdefault("c", 3, weight=2)
+        self.assertEqual(list(cache), ["a", "c"])
+        self.assertEqual(cache.weight, 7)
+        cache.pop("c")
+        self.assertEqual(cache.weight, 5)
+        cache.maxweight = 4
+        self.assertEqual(cache.maxweight, 4)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.weight, 0)
+
+    def test_unbounded(self):
+        cache: LRUCache[int, int] = LRUCache()
+        for i in range(100):
+            cache.put(i, i)
+        self.assertIsNone(cache.maxsize)
+        self.assertEqual(len(cache), 100)
+        self.assertEqual(cache.evictions, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,81 @@
 # coding:utf-8
 
+import os
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 from unittest import main
+from unittest import mock
 
+from xlc.database.langtags import LangDict
+from xlc.database.langtags import LangMarks
 from xlc.database.langtags import LangTag
 from xlc.database.langtags import LangTags
+from xlc.database.registry import Record
+from xlc.database.registry import Registry
 from xlc.database.subtags import Language
 from xlc.database.subtags import Region
 from xlc.database.subtags import Script
+from xlc.database.subtags import Stag
+from xlc.database.subtags import StagDB
+
+
+class TestStagDB(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tempdir = TemporaryDirectory()
+        cls.path: str = os.path.join(cls.tempdir.name, "test.db")
+        StagDB.dump(cls.path, ("code", "name"), {
+            "b": {"code": "B", "name": "bravo"},
+            "a": {"code": "A"},
+            "cc": {"code": "CC", "name": "charlie"},
+        })
+        cls.db: StagDB = StagDB(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tempdir.cleanup()
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_iter_and_len(self):
+        self.assertEqual(len(self.db), 3)
+        self.assertEqual(list(self.db), ["a", "b", "cc"])
+        self.assertEqual(self.db.fields, ("code", "name"))
+        self.assertEqual(self.db.path, self.path)
+
+    def test_contains(self):
+        self.assertIn("CC", self.db)
+        self.assertNotIn("c", self.db)
+        self.assertNotIn("ccc", self.db)
+        self.assertNotIn("d", self.db)
+
+    def test_getitem(self):
+        self.assertEqual(self.db["a"], {"code": "A"})
+        self.assertEqual(self.db["B"], {"code": "B", "name": "bravo"})
+        self.assertEqual(self.db["cc"], {"code": "CC", "name": "charlie"})
+        self.assertRaises(KeyError, self.db.__getitem__, "d")
+
+    def test_invalid(self):
+        path: str = os.path.join(self.tempdir.name, "invalid.db")
+        with open(path, "wb") as whdl:
+            whdl.write(b"\0" * StagDB.HEADER.size)
+        self.assertRaises(ValueError, StagDB, path)
+
+    def test_open(self):
+        self.assertIs(Stag.open(Language.CONFIG), Stag.open(Language.CONFIG))
+
+    def test_dump_mapped(self):
+        path: str = os.path.join(self.tempdir.name, "mapped.db")
+        StagDB.dump(path, ("code",), {"a": {"code": "A"}})
+        mapped: StagDB = StagDB(path)
+        StagDB.dump(path, ("code",), {"b": {"code": "B"}})
+        self.assertEqual(mapped["a"], {"code": "A"})
+        self.assertEqual(StagDB(path)["b"], {"code": "B"})
 
 
 class TestSubTags(TestCase):
@@ -48,6 +116,21 @@ class TestSubTags(TestCase):
         self.assertEqual(script.numeric, 501)
         self.assertEqual(script.alpha_4, "Hans")
 
+    def test_intern(self):
+        Language.CACHE.clear()
+        self.assertIs(Language.get("zh"), Language.get("ZH"))
+        self.assertEqual(Language.CACHE.misses, 1)
+        self.assertEqual(Language.CACHE.hits, 1)
+        self.assertIs(Region.get("cn"), Region.get("CN"))
+        self.assertIs(Script.get("hans"), Script.get("Hans"))
+
+    def test_negative_cache(self):
+        Region.MISSES.clear()
+        self.assertRaises(KeyError, Region.get, "qq")
+        self.assertRaises(KeyError, Region.get, "QQ")
+        self.assertEqual(Region.MISSES.misses, 1)
+        self.assertEqual(Region.MISSES.hits, 1)
+
     def test_region_KeyError(self):
         self.assertRaises(KeyError, Region.get, "xx")
 
@@ -95,6 +178,222 @@ class TestLangTag(TestCase):
         tags = [tag for tag in en_us]
         self.assertEqual(tags, ["en"])
 
+    def test_shape(self):
+        self.assertTrue(LangTag.is_language("zh"))
+        self.assertFalse(LangTag.is_language("z1"))
+        self.assertTrue(LangTag.is_script("Hans"))
+        self.assertFalse(LangTag.is_script("CN"))
+        self.assertTrue(LangTag.is_region("CN"))
+        self.assertTrue(LangTag.is_region("156"))
+        self.assertFalse(LangTag.is_region("1a6"))
+        self.assertFalse(LangTag.is_region("C"))
+        self.assertFalse(LangTag.is_region("中国"))
+
+    def test_KeyError(self):
+        self.assertRaises(KeyError, LangTag, "1x")
+        self.assertRaises(KeyError, LangTag, "en-US1")
+        self.assertRaises(KeyError, LangTag, "en-419")
+        self.assertRaises(KeyError, LangTag, "zh-Han-CN")
+        self.assertRaises(KeyError, LangTag, "zh-Hans-CHN")
+        self.assertRaises(KeyError, LangTag, "en-abc")
+        self.assertRaises(KeyError, LangTag, "en-US-foo")
+        self.assertRaises(KeyError, LangTag, "en-abcde")
+        self.assertRaises(KeyError, LangTag, "en-1996")
+        self.assertRaises(KeyError, LangTag, "de-1996-1996")
+        self.assertRaises(KeyError, LangTag, "en-a")
+        self.assertRaises(KeyError, LangTag, "en-a-foo-a-bar")
+        self.assertRaises(KeyError, LangTag, "en-x")
+
+    def test_extlang(self):
+        zh_yue_hk = LangTag("zh-yue-HK")
+        self.assertEqual(str(zh_yue_hk), "yue-HK")
+        self.assertEqual(zh_yue_hk.tags, ["yue"])
+
+    def test_canonical(self):
+        self.assertEqual(str(LangTag("iw-IL")), "he-IL")
+        self.assertEqual(str(LangTag("en-BU")), "en-MM")
+        self.assertEqual(str(LangTag("i-klingon")), "tlh")
+        self.assertEqual(str(LangTag("zh-min-nan")), "nan")
+        with mock.patch.object(LangTag, "MAXREPLACEMENTS", 1):
+            self.assertEqual(str(LangTag("iw-BU")), "he-MM")
+            self.assertLessEqual(len(LangTag.REPLACEMENTS), 1)
+
+    def test_variants(self):
+        de_de_1996 = LangTag("de-DE-1996")
+        self.assertEqual(str(de_de_1996), "de-DE-1996")
+        self.assertEqual(de_de_1996.variants, ("1996",))
+        self.assertEqual(de_de_1996.tags, ["de-DE", "de"])
+        self.assertEqual(de_de_1996, LangTag("DE_de_1996"))
+        self.assertNotEqual(de_de_1996, LangTag("de-DE"))
+        self.assertEqual(LangTag("sl-rozaj-biske").variants, ("rozaj", "biske"))  # noqa:E501
+        self.assertTrue(LangTag.is_variant("1996"))
+        self.assertTrue(LangTag.is_variant("rozaj"))
+        self.assertFalse(LangTag.is_variant("abcd"))
+        self.assertFalse(LangTag.is_variant("中文中文中"))
+
+    def test_extensions_and_privateuse(self):
+        tag = LangTag("en-US-u-ca-gregory-a-foo-x-Private")
+        self.assertEqual(str(tag), "en-US-a-foo-u-ca-gregory-x-private")
+        self.assertEqual(tag.extensions, ("a-foo", "u-ca-gregory"))
+        self.assertEqual(tag.privateuse, "x-private")
+        self.assertEqual(tag.tags, ["en-US", "en"])
+        self.assertIsNone(LangTag("en").privateuse)
+        self.assertEqual(LangTag("en-x-a").tags, ["en"])
+
+    def test_en_latn(self):
+        en_latn = LangTag("en-latn")
+        self.assertEqual(str(en_latn), "en-Latn")
+        self.assertIsNone(en_latn.region)
+
+    def test_parse_many(self):
+        errors = {}
+        tags = LangTag.parse_many(["zh-Hans-CN", "ZH_hans_cn", "en-QQ", "zh-Hans-CN", "EN_qq", "en"], errors=errors)  # noqa:E501
+        self.assertEqual([str(tag) for tag in tags], ["zh-Hans-CN", "zh-Hans-CN", "None", "zh-Hans-CN", "None", "en"])  # noqa:E501
+        self.assertIs(tags[0], tags[1])
+        self.assertIs(tags[0], tags[3])
+        self.assertEqual(set(errors), {"en-QQ", "EN_qq"})
+        codes = LangTag.parse_many(iter(["zh_hans_cn", "en-us", "xx", "de-DE-1996", "de-DE", "en-US-u-ca-gregory-x-Private"]), compact=True)  # noqa:E501
+        self.assertEqual(codes, [("zh", "Hans", "CN", None), ("en", None, "US", None), None, ("de", None, "DE", "1996"), ("de", None, "DE", None), ("en", None, "US", "u-ca-gregory-x-private")])  # noqa:E501
+
+    def test_eq(self):
+        zh_cn = LangTag("zh-CN")
+        self.assertEqual(zh_cn, zh_cn)
+        self.assertEqual(zh_cn, LangTag("zh_cn"))
+        self.assertEqual(hash(zh_cn), hash(LangTag("zh_cn")))
+        self.assertNotEqual(zh_cn, LangTag("zh-TW"))
+        Region.CACHE.clear()
+        self.assertEqual(zh_cn, LangTag("zh-CN"))
+
+
+class TestRegistry(TestCase):
+    SOURCE = [
+        "File-Date: 2025-08-25\n",
+        "%%\n",
+        "Type: variant\n",
+        "Subtag: 1996\n",
+        "Description: German orthography of 1996\n",
+        "Added: 2005-10-16\n",
+        "Prefix: de\n",
+        "Prefix: de-AT\n",
+        "Comments: first line\n",
+        "  continued\n",
+        "%%\n",
+        "Type: script\n",
+        "Subtag: Qaaa..Qaab\n",
+        "Description: Private use\n",
+        "%%\n",
+        "Type: grandfathered\n",
+        "Tag: i-klingon\n",
+        "Description: Klingon\n",
+        "Deprecated: 2004-02-24\n",
+        "Preferred-Value: tlh\n",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_parse(self):
+        records = list(Registry.parse(self.SOURCE))
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0], {"File-Date": ["2025-08-25"]})
+        self.assertEqual(records[1]["Prefix"], ["de", "de-AT"])
+        self.assertEqual(records[1]["Comments"], ["first line continued"])
+        self.assertEqual(list(Registry.parse(["  orphan\n", "%%\n", "%%\n"])), [])  # noqa:E501
+
+    def test_expand(self):
+        self.assertEqual(list(Registry.expand("1996")), ["1996"])
+        self.assertEqual(list(Registry.expand("qaa..qac")), ["qaa", "qab", "qac"])  # noqa:E501
+        self.assertEqual(list(Registry.expand("Qaay..Qabb")), ["Qaay", "Qaaz", "Qaba", "Qabb"])  # noqa:E501
+        self.assertEqual(list(Registry.expand("XA..XC")), ["XA", "XB", "XC"])  # noqa:E501
+
+    def test_compile(self):
+        with TemporaryDirectory() as temp:
+            source = os.path.join(temp, "language-subtag-registry")
+            with open(source, "w", encoding="utf-8") as whdl:
+                whdl.writelines(self.SOURCE)
+            path = os.path.join(temp, "registry.db")
+            Registry.compile(source, path)
+            database = StagDB(path)
+            self.assertEqual(list(database), ["grandfathered:i-klingon", "script:qaaa", "script:qaab", "variant:1996"])  # noqa:E501
+            self.assertEqual(database["script:qaab"]["subtag"], "Qaab")
+            self.assertEqual(database["variant:1996"]["prefix"], "de\nde-AT")
+
+    def test_record(self):
+        record = Record.get("variant", "1996")
+        self.assertIs(Record.get("VARIANT", "1996"), record)
+        self.assertEqual(record.code, "1996")
+        self.assertEqual(record.type, "variant")
+        self.assertEqual(record.descriptions, ("German orthography of 1996",))  # noqa:E501
+        self.assertEqual(record.added, "2005-10-16")
+        self.assertIsNone(record.deprecated)
+        self.assertIsNone(record.preferred_value)
+        self.assertIn("de", record.prefixes)
+        self.assertIsNone(record.comments)
+        english = Record.get("language", "en")
+        self.assertEqual(english.suppress_script, "Latn")
+        self.assertIsNone(english.macrolanguage)
+        self.assertIsNone(english.scope)
+        self.assertEqual(Record.get("language", "yue").macrolanguage, "zh")
+        self.assertEqual(Record.get("language", "zh").scope, "macrolanguage")
+        self.assertIsNotNone(Record.get("language", "sh").comments)
+        self.assertEqual(Record.get("region", "BU").preferred_value, "MM")
+        self.assertIsNone(Record.find("variant", "xxxxx"))
+
+
+class TestLangDict(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.langs: LangDict = LangDict(maxsize=2)
+
+    def tearDown(self):
+        pass
+
+    def test_fold(self):
+        zh_hans_cn = self.langs.get("ZH_hans_cn")
+        self.assertIs(self.langs["zh_HANS_cn"], zh_hans_cn)
+        self.assertIs(self.langs.get(LangTag("zh-Hans-CN")), zh_hans_cn)
+        self.assertEqual(list(self.langs), [])
+        self.assertEqual(self.langs.size, 2)
+
+    def test_evict(self):
+        en_us = self.langs.get("EN_US")
+        self.langs.get("ZH-CN")
+        self.langs.get("ZH-TW")
+        self.assertEqual(self.langs.evictions, 4)
+        self.assertEqual(self.langs.size, 2)
+        self.assertIsNot(self.langs.get("EN_US"), en_us)
+        self.assertRaises(KeyError, self.langs.get, "en-QQ")
+
+    def test_pin(self):
+        en_us = self.langs.pin("EN_US")
+        self.assertIs(self.langs.pin(LangTag("en-US")), en_us)
+        for name in ("zh-CN", "zh-TW", "en-x-u1", "en-x-u2"):
+            self.langs.get(name)
+        self.assertEqual(list(self.langs), ["en-US"])
+        self.assertEqual(self.langs.size, 3)
+        self.assertIs(self.langs.get("EN_US"), en_us)
+        self.assertIs(self.langs.get("en-US"), en_us)
+        self.assertIs(self.langs.get(LangTag("en-US")), en_us)
+
 
 class TestLangTags(TestCase):
 
@@ -115,6 +414,20 @@ class TestLangTags(TestCase):
     def test_iter_and_len(self):
         self.assertEqual(len([tag for tag in self.langtags]), len(self.langtags))  # noqa:E501
 
+    def test_shared(self):
+        shared = LangTags.shared()
+        self.assertIs(LangTags.shared(), shared)
+        self.assertIs(shared.langmarks, LangMarks.shared())
+        stat = os.stat(LangMarks.CONFIG)
+        try:
+            os.utime(LangMarks.CONFIG, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))  # noqa:E501
+            self.assertIsNot(LangTags.shared(), shared)
+        finally:
+            os.utime(LangMarks.CONFIG, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # noqa:E501
+        shared = LangTags.shared(reload=True)
+        self.assertIsNot(LangTags.shared(), LangTags.shared(reload=True))
+        self.assertEqual(len(shared), len(self.langtags))
+
     def test_lookup_aa(self):
         self.assertRaises(LookupError, self.langtags.lookup, "aa")
 
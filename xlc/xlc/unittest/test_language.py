@@ -1,13 +1,27 @@
 # coding:utf-8
 
+from asyncio import gather
+from asyncio import run
 import os
+import shutil
+from tempfile import TemporaryDirectory
+from time import sleep
 from unittest import TestCase
 from unittest import main
 from unittest import mock
 
+import toml
+
+from xlc.database.langtags import LangDict
+from xlc.database.langtags import LangTag
 from xlc.database.langtags import LangTags
+from xlc.language.catalog import Catalog
+from xlc.language.catalog import CompiledCatalog
 from xlc.language import segment
 from xlc.language.message import Message
+from xlc.language.report import Report
+from xlc.language.search import SearchIndex
+from xlc.language.search import Shard
 
 
 class TestSegment(TestCase):
@@ -31,6 +45,10 @@ key = "value: {value}"
 [login]
 username = "Username: {username}"
 password = "Password: {password}"
+
+[format]
+count = 3
+escape = "{{literal}} {value}"
 """
         with mock.patch.object(segment, "open", mock.mock_open(read_data=cls.data)):  # noqa:E501
             cls.root: segment.Segment = segment.Segment.loadf("en.xlc")
@@ -54,20 +72,174 @@ password = "Password: {password}"
         self.assertEqual(self.root.seek("section2.section3").get("key3"), "value3")  # noqa:E501
         self.assertEqual(self.root.seek("section2.section3.section4").get("key4"), "value4")  # noqa:E501
 
+    def test_compile(self):
+        catalog = self.root.compile()
+        self.assertIs(catalog.lang, self.root.lang)
+        self.assertEqual(catalog.get("section1.key1"), "value1")
+        self.assertEqual(catalog["section2.section3.section4.key4"], "value4")  # noqa:E501
+        self.assertEqual(catalog.get("section2.section3.language"), "en")
+        self.assertIn("login.username", catalog)
+        self.assertEqual(len(catalog), len(list(catalog)))
+        dump = self.root.dump()
+        self.assertIsNone(catalog.get("section9.key9"))
+        self.assertEqual(catalog.get("section9.key9", "-"), "-")
+        self.assertNotIn("section9.key9", catalog)
+        self.assertRaises(KeyError, catalog.__getitem__, "section9.key9")
+        self.assertEqual(self.root.dump(), dump)
+
+    def test_compiled(self):
+        with TemporaryDirectory() as tempdir:
+            path: str = os.path.join(tempdir, "en.xlcc")
+            self.root.dumpc(path)
+            self.assertEqual(segment.Segment.loadc(path).dump(), self.root.dump())  # noqa:E501
+            catalog = segment.CompiledCatalog(self.root.lang, path)
+            self.assertEqual(catalog.path, path)
+            self.assertIs(catalog.lang, self.root.lang)
+            self.assertEqual(dict(catalog), self.root.flatten())
+            self.assertEqual(len(catalog), len(self.root.flatten()))
+            self.assertEqual(catalog["format.count"], 3)
+            self.assertEqual(catalog.get("section2.section3.key3"), "value3")
+            self.assertIsNone(catalog.get("section9.key9"))
+            self.assertRaises(KeyError, catalog.__getitem__, "section9.key9")
+            self.assertIn("login.username", catalog)
+            self.assertNotIn(1, catalog)
+            catalog.close()
+            dated = segment.Segment.loads(self.root.lang, "day = 2024-01-02\nat = 2024-01-02T03:04:05Z\nclock = 03:04:05\ndays = [2024-01-02]\n")  # noqa:E501
+            dated.dumpc(path)
+            self.assertEqual(segment.Segment.loadc(path).dump(), dated.dump())  # noqa:E501
+            dotted = segment.Segment.loads(self.root.lang, "[a]\n\"b.c\" = \"dotted\"\nplain = \"x\"\n")  # noqa:E501
+            dotted.dumpc(path)
+            loaded = segment.Segment.loadc(path)
+            self.assertEqual(loaded.dump(), dotted.dump())
+            self.assertEqual(loaded.seek("a").get("b.c"), "dotted")
+            self.assertFalse(loaded.exists("a.b"))
+            catalog = segment.CompiledCatalog(self.root.lang, path)
+            self.assertEqual(catalog["a.b.c"], "dotted")
+            self.assertEqual([catalog.parts(i) for i in range(len(catalog))], [("language",), ("a", "language"), ("a", "b.c"), ("a", "plain")])  # noqa:E501
+            catalog.close()
+            self.root.dumpc(path)
+            with mock.patch.object(segment.CompiledCatalog, "dumps", side_effect=TypeError):  # noqa:E501
+                self.assertRaises(TypeError, self.root.dumpc, path)
+            self.assertEqual(os.listdir(tempdir), ["en.xlcc"])
+            with open(path, "wb") as whdl:
+                whdl.write(segment.CompiledCatalog.dumps(()).replace(b"XLCC", b"XLCX"))  # noqa:E501
+            self.assertRaises(ValueError, segment.CompiledCatalog, self.root.lang, path)  # noqa:E501
+
     def test_render(self):
         self.assertEqual(self.root.find("render").fill(value="test")["key"], "value: test")  # noqa:E501
         self.assertEqual(self.root.find("login").fill(username="test", password="1234"),  # noqa:E501
                          {"language": "en", "username": "Username: test", "password": "Password: 1234"})  # noqa:E501
 
+    def test_render_single(self):
+        login = self.root.find("login")
+        self.assertEqual(login.render("username", username="test"), "Username: test")  # noqa:E501
+        self.assertEqual(login.render("language"), "en")
+        self.assertRaises(KeyError, login.render, "password")
+        fmt = self.root.find("format")
+        self.assertEqual(fmt.render("count"), "3")
+        self.assertEqual(fmt.render("escape", value=1), "{literal} 1")
+        fmt.set("escape", "plain")
+        self.assertEqual(fmt.render("escape"), "plain")
+
+    def test_invalid_template(self):
+        for value in ("{0}", "{}", "{", ":-}", '{\\"a\\": 1}'):
+            loaded = segment.Segment.loads(self.root.lang, f'key = "{value}"')  # noqa:E501
+            self.assertEqual(loaded.get("key"), value.replace("\\", ""))
+            self.assertRaises(ValueError, loaded.render, "key")
+            self.assertRaises(ValueError, loaded.fill)
+        fmt = segment.Segment.generate("en").seek("format")
+        fmt.set("count", "{0}")
+        self.assertRaises(ValueError, fmt.render, "count")
+        fmt.set("count", "{count}")
+        self.assertEqual(fmt.render("count", count=3), "3")
+        fmt.set("count", "{")
+        self.assertRaises(ValueError, fmt.render, "count")
+
     def test_dump(self):
-        with mock.patch.object(segment, "open", mock.mock_open()):
-            self.assertIsNone(self.root.dumpf("en.xlc"))
+        with TemporaryDirectory() as tempdir:
+            path: str = os.path.join(tempdir, "en.xlc")
+            self.assertTrue(self.root.dumpf(path))
+            mtime: int = os.stat(path).st_mtime_ns
+            self.assertFalse(self.root.dumpf(path))
+            self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+            self.assertEqual(segment.Segment.loadf(path).dump(), self.root.dump())  # noqa:E501
+            with open(path, "a", encoding="utf-8") as whdl:
+                whdl.write("changed = true\n")
+            self.assertTrue(self.root.dumpf(path))
+            self.assertEqual(os.listdir(tempdir), ["en.xlc"])
+
+    def test_dump_failed(self):
+        with TemporaryDirectory() as tempdir:
+            path: str = os.path.join(tempdir, "en.xlc")
+            with mock.patch.object(segment.Segment, "stream", side_effect=TypeError):  # noqa:E501
+                self.assertRaises(TypeError, self.root.dumpf, path)
+            with mock.patch.object(segment.os, "replace", side_effect=OSError):  # noqa:E501
+                self.assertRaises(OSError, self.root.dumpf, path)
+            self.assertEqual(os.listdir(tempdir), [])
+
+    def test_dumps(self):
+        root = segment.Segment.load(self.root.lang, {"c d": {"é": {"f": 1}}})
+        root.seek("table").set("inline", {"key": "value", "nested": {"x": 1}})  # noqa:E501
+        root.seek("empty")
+        self.assertEqual(root.dumps(), toml.dumps(root.dump()))
+        self.assertEqual(self.root.dumps(), toml.dumps(self.root.dump()))
 
     def test_generate_en(self):
         lang = segment.Segment.generate("en").lang
         self.assertEqual(lang.name, "en")
 
 
+class TestTemplate(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_simple(self):
+        template = segment.Template("Hello {name}, {count} new {{messages}}")
+        self.assertEqual(template.fields, frozenset({"name", "count"}))
+        self.assertEqual(template.render(name="test", count=2), "Hello test, 2 new {messages}")  # noqa:E501
+        self.assertEqual(str(template), template.text)
+        self.assertRaises(KeyError, template.render, name="test")
+
+    def test_complex(self):
+        template = segment.Template("{user.name!r:>{width}} {items[0]}")
+        self.assertEqual(template.fields, frozenset({"user", "width", "items"}))  # noqa:E501
+        user = mock.Mock()
+        user.name = "test"
+        self.assertEqual(template.render(user=user, width=8, items=[1]), "  'test' 1")  # noqa:E501
+
+    def test_compact(self):
+        template = segment.Template("{name} and {{escaped}}")
+        self.assertEqual(template.render(name="test"), "test and {escaped}")
+        self.assertIs(segment.Template("Hi {name}").fields, template.fields)
+        self.assertFalse(hasattr(template, "__dict__"))
+        with mock.patch.object(segment.Template, "MAXFIELDS", 0):
+            self.assertEqual(segment.Template("{name}").fields, template.fields)  # noqa:E501
+        root = segment.Segment.generate("en")
+        self.assertFalse(hasattr(root, "__dict__"))
+        self.assertFalse(hasattr(root.lang, "__dict__"))
+        self.assertFalse(hasattr(LangTag("en"), "__dict__"))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, segment.Template, "{}")
+        self.assertRaises(ValueError, segment.Template, "{0}")
+        self.assertRaises(ValueError, segment.Template, "{name")
+        self.assertTrue(segment.Template.need("{name}"))
+        self.assertFalse(segment.Template.need("name"))
+        self.assertFalse(segment.Template.need(1))
+
+
 class TestMessage(TestCase):
 
     @classmethod
@@ -147,6 +319,418 @@ class TestMessage(TestCase):
     def test_lookup_zh(self):
         self.assertRaises(LookupError, self.message.lookup, "zh")
 
+    def test_resolve(self):
+        message: Message = Message(self.dirname)
+        zh_hans = message.resolve("ZH_hans_cn")
+        self.assertEqual(zh_hans.name, "zh-Hans")
+        self.assertIs(message.resolve("ZH_hans_cn"), zh_hans)
+        self.assertIs(message.resolve("zh-Hans-CN"), zh_hans)
+        self.assertIs(message.resolve(LangTag("zh-Hans-SG")), zh_hans)
+        self.assertRaises(LookupError, message.resolve, "zh")
+        self.assertRaises(LookupError, message.resolve, "zh")
+        self.assertRaises(KeyError, message.resolve, "xx")
+        with mock.patch.object(Message, "RESOLUTIONS", 2):
+            self.assertIs(message.resolve("zh-hans-sg"), zh_hans)
+            self.assertIs(message.resolve("zh-hans-sg"), zh_hans)
+
+    def test_languages_bounded(self):
+        message: Message = Message(self.dirname)
+        for i in range(LangDict.MAXSIZE):
+            self.assertEqual(message.lookup(f"en-x-u{i}").lang.name, "en")
+        self.assertLessEqual(message.languages.size, len(message.languages) + LangDict.MAXSIZE)  # noqa:E501
+        self.assertEqual(sorted(message.languages), sorted(message))
+
+    def test_accept(self):
+        self.assertEqual(Message.accept("fr-CH, fr;q=0.9, en;q=0.8, de;q=0.7, *;q=0.5"),  # noqa:E501
+                         ["fr-CH", "fr", "en", "de"])
+        self.assertEqual(Message.accept("en;q=0.5, zh-TW, zh;q=0, de;q=x, it;p=1, ja;q=2, ko;q=nan"),  # noqa:E501
+                         ["zh-TW", "en"])
+        self.assertEqual(Message.accept(""), [])
+        self.assertEqual(len(Message.accept(",".join(["en"] * 1000))), Message.ACCEPT_RANGES)  # noqa:E501
+
+    def test_negotiate(self):
+        message: Message = Message(self.dirname)
+        header: str = "fr-CH, zh-Hant-HK;q=0.8, en;q=0.9"
+        en = message.negotiate(header)
+        self.assertEqual(en.lang.name, "en")
+        self.assertIs(message.negotiate(header), en)
+        self.assertEqual(message.negotiate("xx-Bad-Tag-1, zh-hant-hk").lang.name, "zh-Hant")  # noqa:E501
+        self.assertIs(message.negotiate("fr, de", default="en"), en)
+        self.assertIs(message.negotiate("fr, de", default="en"), en)
+        self.assertRaises(LookupError, message.negotiate, "fr, de")
+        self.assertRaises(LookupError, message.negotiate, "zh;" * 10000)
+
+    def test_stats(self):
+        message: Message = Message(self.dirname, maxsize=1)
+        en = message.lookup("en")
+        self.assertIs(message.lookup("en"), en)
+        message.lookup("zh-hans")
+        self.assertIsNot(message.lookup("en"), en)
+        stats = message.stats
+        self.assertEqual(stats.loaded, 1)
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.misses, 3)
+        self.assertEqual(stats.loads, 3)
+        self.assertEqual(stats.evictions, 2)
+        self.assertGreater(stats.load_time, 0.0)
+
+    def test_alookup(self):
+        async def burst(message: Message):
+            return await gather(*(message.alookup("zh-hans-cn") for _ in range(500)))  # noqa:E501
+
+        message: Message = Message(self.dirname)
+        segments = run(burst(message))
+        self.assertEqual(message.stats.loads, 1)
+        self.assertTrue(all(segment is segments[0] for segment in segments))
+        self.assertIs(run(message.aload(message.resolve("zh-hans"))), segments[0])  # noqa:E501
+        self.assertEqual(message.stats.loads, 1)
+
+    def test_preload(self):
+        for executor in ("process", "thread"):
+            message: Message = Message(self.dirname)
+            timings = message.preload(workers=2, executor=executor)
+            self.assertEqual(len(timings), len(os.listdir(self.dirname)))
+            self.assertEqual(message.stats.loads, len(timings))
+            self.assertEqual(message.lookup("zh-hans-cn").lang.name, "zh-Hans")
+            self.assertEqual(message.stats.loads, len(timings))
+            self.assertEqual(message.preload(executor=executor), {})
+
+    def test_preload_tags(self):
+        message: Message = Message(self.dirname)
+        en = message.lookup("en")
+        timings = message.preload(["en", "zh-hans-cn"], executor="thread")
+        self.assertEqual(list(timings), [os.path.join(self.dirname, "zh-Hans.xlc")])  # noqa:E501
+        self.assertIs(message.lookup("en"), en)
+        self.assertRaises(ValueError, message.preload, executor="fiber")
+
+    def test_maxbytes(self):
+        en: int = os.path.getsize(os.path.join(self.dirname, "en.xlc"))
+        zh: int = os.path.getsize(os.path.join(self.dirname, "zh-Hans.xlc"))
+        message: Message = Message(self.dirname, maxbytes=en + zh - 1)
+        message.lookup("en")
+        self.assertEqual(message.stats.weight, en)
+        message.lookup("zh-hans")
+        self.assertEqual(message.stats.weight, zh)
+        self.assertEqual(message.stats.loaded, 1)
+
+
+class TestMessageRefresh(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dirname: str = os.path.join(os.path.dirname(__file__), "messages")
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.base: str = os.path.join(self.tempdir.name, "messages")
+        shutil.copytree(self.dirname, self.base)
+        self.message: Message = Message(self.base)
+
+    def tearDown(self):
+        self.message.unwatch()
+        self.tempdir.cleanup()
+
+    def write(self, filename: str, data: str):
+        path: str = os.path.join(self.base, filename)
+        mtime: int = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+        with open(path, "w", encoding="utf-8") as whdl:
+            whdl.write(data)
+        os.utime(path, ns=(mtime + 1000, mtime + 1000))
+        return path
+
+    def test_refresh_changed(self):
+        en = self.message.lookup("en")
+        self.assertEqual(self.message.refresh(), ())
+        path = self.write("en.xlc", "[login]\nusername = \"User\"\n")
+        self.assertIs(self.message.lookup("en"), en)
+        self.assertEqual(self.message.refresh(), (path,))
+        self.assertIsNot(self.message.lookup("en"), en)
+        self.assertEqual(self.message.lookup("en").seek("login").get("username"), "User")  # noqa:E501
+
+    def test_refresh_added_and_removed(self):
+        self.assertRaises(LookupError, self.message.lookup, "zh")
+        added = self.write("zh.xlc", "[login]\nusername = \"用户名\"\n")
+        self.assertEqual(self.message.refresh(), (added,))
+        self.assertEqual(self.message.lookup("zh").lang.name, "zh")
+        os.remove(added)
+        self.assertEqual(self.message.refresh(), (added,))
+        self.assertRaises(LookupError, self.message.lookup, "zh")
+
+    def test_refresh_failed(self):
+        en = self.message.lookup("en")
+        self.message.lookup("zh-Hant")
+        self.message.catalog("en")
+        self.write("en.xlc", "[login\n")
+        changed = self.write("zh-Hant.xlc", "[login]\nusername = \"用戶名\"\n")  # noqa:E501
+        unknown = self.write("xx.xlc", "[login]\n")
+        with self.assertLogs("xlc.language.message", "WARNING") as logs:
+            self.assertEqual(self.message.refresh(), (changed,))
+        self.assertEqual(len(logs.records), 2)
+        self.assertIs(self.message.lookup("en"), en)
+        self.assertEqual(self.message.catalog("en").get("login.username"), "Username")  # noqa:E501
+        self.assertEqual(self.message.lookup("zh-Hant").seek("login").get("username"), "用戶名")  # noqa:E501
+        with self.assertNoLogs("xlc.language.message"):
+            self.assertEqual(self.message.refresh(), ())
+        path = self.write("en.xlc", "[login]\nusername = \"User\"\n")
+        os.remove(unknown)
+        self.assertEqual(self.message.refresh(), (path,))
+        self.assertEqual(self.message.lookup("en").seek("login").get("username"), "User")  # noqa:E501
+        self.assertEqual(self.message.catalog("en").get("login.username"), "User")  # noqa:E501
+
+    def test_init_failed(self):
+        self.write("xx.xlc", "[login]\n")
+        self.assertRaises(KeyError, Message, self.base)
+        os.remove(os.path.join(self.base, "xx.xlc"))
+        self.write("en.xlc", "[login\n")
+        message: Message = Message(self.base)  # catalogs are parsed on load
+        self.assertRaises(ValueError, message.lookup, "en")
+
+    def test_watch_failed(self):
+        with mock.patch.object(Message, "scan", side_effect=OSError("gone")):  # noqa:E501
+            with self.assertLogs("xlc.language.message", "ERROR"):
+                self.message.watch(interval=0.01)
+                sleep(0.05)
+        self.write("en.xlc", "[login]\nusername = \"User\"\n")
+        for _ in range(100):  # the watcher survived
+            if self.message.catalog("en").get("login.username") == "User":
+                break
+            sleep(0.01)
+        self.assertEqual(self.message.catalog("en").get("login.username"), "User")  # noqa:E501
+        self.message.unwatch()
+
+    def test_compiled(self):
+        path: str = os.path.join(self.base, "en.xlc")
+        compiled: str = Message.compiled(path)
+        self.assertFalse(Message.fresh(path))
+        changed = segment.Segment.loads(segment.Segment.filelang(path), "[login]\nusername = \"User\"\n")  # noqa:E501
+        changed.dumpc(compiled)
+        mtime: int = os.stat(path).st_mtime_ns
+        os.utime(compiled, ns=(mtime, mtime))
+        self.assertTrue(Message.fresh(path))
+        self.assertEqual(self.message.lookup("en").seek("login").get("username"), "User")  # noqa:E501
+        os.utime(path, ns=(mtime + 1000, mtime + 1000))
+        self.assertFalse(Message.fresh(path))
+        self.message.refresh()
+        self.assertEqual(self.message.lookup("en").seek("login").get("username"), "Username")  # noqa:E501
+
+    def test_catalog(self):
+        catalog = self.message.catalog("en-US")
+        self.assertIsInstance(catalog, Catalog)
+        self.assertIs(self.message.catalog("en"), catalog)
+        self.assertEqual(catalog.get("login.username"), "Username")
+        self.assertFalse(self.message.mapped)
+
+    def test_catalog_mapped(self):
+        message: Message = Message(self.base, mapped=True)
+        self.assertTrue(message.mapped)
+        catalog = message.catalog("en")
+        self.assertIsInstance(catalog, CompiledCatalog)
+        self.assertIs(message.catalog("en"), catalog)
+        self.assertTrue(Message.fresh(os.path.join(self.base, "en.xlc")))
+        self.assertEqual(catalog.get("login.username"), "Username")
+        path = self.write("en.xlc", "[login]\nusername = \"User\"\n")
+        mtime: int = os.stat(Message.compiled(path)).st_mtime_ns + 1000
+        os.utime(path, ns=(mtime, mtime))
+        self.assertEqual(message.refresh(), (path,))
+        self.assertEqual(message.catalog("en").get("login.username"), "User")  # noqa:E501
+        self.assertEqual(Message(self.base, mapped=True).catalog("en").get("login.username"), "User")  # noqa:E501
+        os.remove(path)
+        self.assertEqual(message.refresh(), (path,))
+        self.assertRaises(LookupError, message.catalog, "en")
+
+    def test_watch(self):
+        en = self.message.lookup("en")
+        self.message.watch(interval=0.01)
+        self.message.watch(interval=0.01)
+        self.write("en.xlc", "[login\n")
+        sleep(0.05)
+        self.assertIs(self.message.lookup("en"), en)
+        self.write("en.xlc", "[login]\nusername = \"User\"\n")
+        for _ in range(100):
+            if self.message.lookup("en") is not en:
+                break
+            sleep(0.01)
+        self.assertIsNot(self.message.lookup("en"), en)
+        self.message.unwatch()
+
+
+class TestReport(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.base: str = self.tempdir.name
+        self.write("en.xlc", "[login]\nusername = \"Username\"\nwelcome = \"Hi {name}\"\nbye = \"Bye {name}\"\ncount = 3\n")  # noqa:E501
+        self.write("zh-Hans.xlc", "[login]\nusername = \"用户\"\nwelcome = \"你好 {user}\"\nbye = \"再见 {name\"\nextra = \"多余\"\n")  # noqa:E501
+        self.write("zh-Hant.xlc", "[login]\nusername = \"用戶\"\nwelcome = \"你好 {name}\"\nbye = \"再見 {name}\"\ncount = 3\n")  # noqa:E501
+        self.report: Report = Report(Message(self.base), "en-US")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def write(self, filename: str, data: str):
+        with open(os.path.join(self.base, filename), "w", encoding="utf-8") as whdl:  # noqa:E501
+            whdl.write(data)
+
+    def test_fields(self):
+        self.assertEqual(self.report.reference.name, "en")
+        self.assertEqual(self.report.message.base, self.base)
+        self.assertEqual(self.report.path, os.path.join(self.base, "en.xlc"))
+        self.assertEqual(self.report.fields, {"login.username": frozenset(), "login.welcome": {"name"}, "login.bye": {"name"}, "login.count": frozenset()})  # noqa:E501
+
+    def test_locales(self):
+        reports = list(self.report.locales())
+        self.assertEqual([r.language for r in reports], ["zh-Hans", "zh-Hant"])  # noqa:E501
+        hans, hant = reports
+        self.assertEqual(hans.missing, ("login.count",))
+        self.assertEqual(hans.obsolete, ("login.extra",))
+        self.assertEqual(hans.invalid, ("login.bye",))
+        self.assertEqual(hans.mismatches, {"login.welcome": ({"name"}, {"user"})})  # noqa:E501
+        self.assertEqual(hans.coverage, 0.75)
+        self.assertFalse(hans.passed)
+        self.assertTrue(hant.passed)
+        self.assertEqual(hans.dump()["mismatches"], {"login.welcome": {"reference": ["name"], "locale": ["user"]}})  # noqa:E501
+        self.assertEqual(list(Report.text(hant)), ["zh-Hant: 100.0% of 4 keys, 0 missing, 0 obsolete, 0 invalid, 0 mismatched"])  # noqa:E501
+        self.assertEqual(list(Report.text(hans))[1:], ["  missing login.count", "  invalid login.bye", "  mismatch login.welcome: {name} != {user}"])  # noqa:E501
+
+    def test_locales_tags(self):
+        reports = list(self.report.locales(["zh-Hant-TW", "en"]))
+        self.assertEqual([r.language for r in reports], ["zh-Hant"])
+        path: str = os.path.join(self.base, "zh-Hant.xlc")
+        segment.Segment.loadf(path).dumpc(Message.compiled(path))
+        self.assertTrue(Message.fresh(path))
+        self.assertTrue(self.report.compare(path).passed)
+        self.write("en.xlc", "")
+        self.assertEqual(Report(Message(self.base)).compare(os.path.join(self.base, "zh-Hant.xlc")).coverage, 1.0)  # noqa:E501
+
+    def test_locales_failed(self):
+        self.write("xx.xlc", "[login]\nusername = \"xx\"\n")
+        self.write("zh-Hant.xlc", "[login\n")
+        reports = list(self.report.locales())
+        self.assertEqual([r.language for r in reports], ["xx", "zh-Hans", "zh-Hant"])  # noqa:E501
+        unknown, _, invalid = reports
+        self.assertTrue(unknown.error.startswith("KeyError: "))
+        self.assertTrue(invalid.error.startswith("TomlDecodeError: "))
+        self.assertFalse(unknown.passed)
+        self.assertEqual(unknown.coverage, 0.0)
+        self.assertEqual(unknown.dump()["error"], unknown.error)
+        self.assertEqual(list(Report.text(unknown)), [f"xx: {unknown.error}"])  # noqa:E501
+
+
+class TestSearchIndex(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.base: str = self.tempdir.name
+        self.write("en.xlc", "[login]\nusername = \"Username\"\nwelcome = \"Welcome {name}\"\ncount = 3\n")  # noqa:E501
+        self.write("zh-Hans.xlc", "[login]\nusername = \"用户名\"\nwelcome = \"欢迎 {name}\"\n")  # noqa:E501
+        self.index: SearchIndex = SearchIndex(Message(self.base))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def write(self, filename: str, data: str) -> str:
+        path: str = os.path.join(self.base, filename)
+        shard: str = SearchIndex.sharded(path)
+        mtime: int = os.stat(shard).st_mtime_ns if os.path.exists(shard) else 0  # noqa:E501
+        with open(path, "w", encoding="utf-8") as whdl:
+            whdl.write(data)
+        os.utime(path, ns=(mtime + 1000, mtime + 1000))
+        return path
+
+    def test_search(self):
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.message.base, self.base)
+        self.assertEqual(self.index.search("USER"), [("en", "login.username")])  # noqa:E501
+        self.assertEqual(self.index.search("{name}"), [("en", "login.welcome"), ("zh-Hans", "login.welcome")])  # noqa:E501
+        self.assertEqual(self.index.search("用户"), [("zh-Hans", "login.username")])  # noqa:E501
+        self.assertEqual(self.index.search("WE"), [("en", "login.welcome")])  # noqa:E501
+        self.assertEqual(self.index.search("userx"), [])
+        self.assertEqual(self.index.search("3"), [])
+        self.assertEqual(self.index.search("{name}", ["zh-Hans-CN"]), [("zh-Hans", "login.welcome")])  # noqa:E501
+
+    def test_persist(self):
+        path: str = os.path.join(self.base, "en.xlc")
+        self.assertTrue(SearchIndex.fresh(path))
+        with mock.patch.object(Shard, "dump") as dump:
+            index: SearchIndex = SearchIndex(Message(self.base))
+            dump.assert_not_called()
+        self.assertEqual(index.search("user"), [("en", "login.username")])
+        self.assertEqual(sorted(os.listdir(self.base)), ["en.xlc", "en.xlci", "zh-Hans.xlc", "zh-Hans.xlci"])  # noqa:E501
+        with open(SearchIndex.sharded(path), "wb") as whdl:
+            whdl.write(Shard.dumps({}).replace(b"XLCI", b"XLCX"))
+        self.assertRaises(ValueError, Shard, "en", SearchIndex.sharded(path))
+        self.assertEqual(SearchIndex(Message(self.base)).search("user"), [("en", "login.username")])  # noqa:E501
+
+    def test_shard(self):
+        path: str = os.path.join(self.base, "shard.xlci")
+        Shard.dump(path, {"a": "abcd", "b": "bcde", "c": "x"})
+        shard: Shard = Shard("en", path)
+        self.assertEqual(len(shard), 3)
+        self.assertEqual(shard.language, "en")
+        self.assertEqual(shard.search("bcd"), ["a", "b"])
+        self.assertEqual(shard.search("abcde"), [])
+        self.assertEqual(shard.search("zzz"), [])
+        self.assertEqual(shard.search("x"), ["c"])
+        shard.close()
+        Shard.dump(path, {})
+        shard = Shard("en", path)
+        self.assertEqual(shard.search("abc"), [])
+        self.assertEqual(shard.search(""), [])
+        shard.close()
+
+    def test_update(self):
+        self.assertEqual(self.index.update(), ())
+        changed: str = self.write("en.xlc", "[login]\nusername = \"User\"\n")  # noqa:E501
+        added: str = self.write("zh-Hant.xlc", "[login]\nusername = \"用戶名\"\n")  # noqa:E501
+        self.assertFalse(SearchIndex.fresh(changed))
+        self.assertEqual(sorted(self.index.update()), [changed, added])
+        self.assertEqual(self.index.search("name", ["en"]), [])
+        self.assertEqual(self.index.search("戶名"), [("zh-Hant", "login.username")])  # noqa:E501
+        os.remove(added)
+        os.remove(SearchIndex.sharded(changed))
+        self.assertEqual(self.index.update(), (added,))
+        self.assertFalse(os.path.exists(SearchIndex.sharded(added)))
+        self.assertEqual(self.index.search("戶名"), [])
+
+    def test_update_failed(self):
+        unknown: str = self.write("xx.xlc", "[login]\nusername = \"xx\"\n")  # noqa:E501
+        invalid: str = self.write("en.xlc", "[login\n")
+        with self.assertLogs("xlc.language.search", "WARNING") as logs:
+            self.assertEqual(self.index.update(), ())
+            index: SearchIndex = SearchIndex(self.index.message)
+        self.assertEqual(len(logs.records), 4)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(self.index.search("user"), [("en", "login.username")])  # noqa:E501
+        with self.assertNoLogs("xlc.language.search"):
+            self.assertEqual(self.index.update(), ())
+        os.remove(unknown)
+        self.write("en.xlc", "[login]\nusername = \"User\"\n")
+        self.assertEqual(self.index.update(), (invalid,))
+        self.assertEqual(self.index.search("user"), [("en", "login.username")])  # noqa:E501
+        self.write("zh-Hant.xlc", "[login]\nusername = \"用戶名\"\n")
+        self.index.message.refresh()
+        self.assertRaises(LookupError, self.index.search, "user", ["zh-Hant"])  # noqa:E501
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,124 @@
+# coding:utf-8
+
+from asyncio import run
+import os
+import shutil
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest import main
+
+from xlc.database.langtags import LangTags
+from xlc.language.message import Message
+from xlc.language.segment import Segment
+from xlc.observer import Collector
+from xlc.observer import Observer
+from xlc.observer import Observers
+
+
+class TestObservers(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.observer: Observer = Observer()
+
+    def tearDown(self):
+        Observers.unregister(self.observer)
+
+    def test_register(self):
+        self.assertEqual(Observers.OBSERVERS, ())
+        self.assertIs(Observers.register(self.observer), self.observer)
+        Observers.register(self.observer)
+        self.assertEqual(Observers.OBSERVERS, (self.observer,))
+        Observers.emit("on_load", "en.xlc", 0.1)
+        Observers.emit("on_hit", "en.xlc")
+        Observers.emit("on_miss", "en.xlc")
+        Observers.emit("on_resolve", "en", "en", 0)
+        Observers.emit("on_missing_key", "en", "login")
+        Observers.emit("on_format_error", "en", "login", KeyError("name"))
+        Observers.unregister(self.observer)
+        self.assertEqual(Observers.OBSERVERS, ())
+
+
+class TestCollector(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dirname: str = os.path.join(os.path.dirname(__file__), "messages")
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        self.collector: Collector = Observers.register(Collector())
+
+    def tearDown(self):
+        Observers.unregister(self.collector)
+
+    def test_message(self):
+        message: Message = Message(self.dirname)
+        message.lookup("zh-Hans")
+        message.lookup("zh-hans-cn")
+        self.assertRaises(LookupError, message.lookup, "zh")
+        summary = self.collector.summary()
+        self.assertEqual(summary["hits"], 1)
+        self.assertEqual(summary["misses"], 1)
+        self.assertEqual(summary["resolutions"], 2)
+        self.assertEqual(summary["fallbacks"], 1)
+        self.assertEqual(summary["fallback_depths"], {"0": 1, "1": 1})
+        self.assertEqual(summary["missing_tags"], {"zh": 1})
+        self.assertEqual(list(summary["loads"]), [os.path.join(self.dirname, "zh-Hans.xlc")])  # noqa:E501
+        self.collector.reset()
+        self.assertEqual(self.collector.summary()["hits"], 0)
+
+    def test_alookup(self):
+        message: Message = Message(self.dirname)
+        self.assertIs(run(message.alookup("zh-Hans")), run(message.alookup("zh-hans-cn")))  # noqa:E501
+        summary = self.collector.summary()
+        self.assertEqual(summary["hits"], 1)
+        self.assertEqual(summary["misses"], 1)
+        self.assertEqual(len(summary["loads"]), 1)
+        self.assertEqual((message.stats.hits, message.stats.misses), (1, 1))  # noqa:E501
+
+    def test_preload(self):
+        message: Message = Message(self.dirname)
+        timings = message.preload(["en"], executor="thread")
+        loads = self.collector.summary()["loads"]
+        self.assertEqual(list(loads), list(timings))
+
+    def test_loadc(self):
+        with TemporaryDirectory() as tempdir:
+            path: str = os.path.join(tempdir, "en.xlcc")
+            shutil.copy(os.path.join(self.dirname, "en.xlc"), tempdir)
+            Segment.loadf(os.path.join(tempdir, "en.xlc")).dumpc(path)
+            Segment.loadc(path)
+            self.assertEqual(len(self.collector.summary()["loads"]), 2)
+
+    def test_langtags(self):
+        langtags: LangTags = LangTags.shared()
+        langtags.lookup("zh-Hans")
+        langtags.lookup("zh-Hans-FR")
+        self.assertRaises(LookupError, langtags.lookup, "ja-JP")
+        summary = self.collector.summary()
+        self.assertEqual(summary["fallback_depths"], {"0": 1, "1": 1})
+        self.assertEqual(summary["missing_tags"], {"ja-JP": 1})
+
+    def test_section(self):
+        segment: Segment = Segment.generate("en")
+        segment.seek("login").set("username", "Username: {name}")
+        segment.seek("login")
+        self.assertRaises(KeyError, segment.seek("login").fill)
+        summary = self.collector.summary()
+        self.assertEqual(summary["missing_keys"], {"en:login": 1})
+        self.assertEqual(summary["format_errors"], {"en:username": 1})
+
+
+if __name__ == "__main__":
+    main()
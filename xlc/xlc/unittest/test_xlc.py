@@ -0,0 +1,49 @@
+# coding:utf-8
+
+from unittest import TestCase
+from unittest import main
+
+import xlc
+from xlc import database
+from xlc import language
+
+
+class TestLazy(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_getattr(self):
+        from xlc.database.langtags import LangTag
+        from xlc.language.message import Message
+
+        for module in (xlc, database, language):
+            for name in module.__all__:
+                self.assertIs(getattr(module, name), module.__getattr__(name))  # noqa:E501
+        self.assertIs(xlc.LangTag, LangTag)
+        self.assertIs(xlc.Message, Message)
+        self.assertIs(database.LangTag, LangTag)
+        self.assertIs(language.Message, Message)
+
+    def test_attribute_error(self):
+        for module in (xlc, database, language):
+            self.assertRaises(AttributeError, getattr, module, "Unknown")
+
+    def test_dir(self):
+        for module in (xlc, database, language):
+            self.assertTrue(set(module.__all__) <= set(dir(module)))
+
+
+if __name__ == "__main__":
+    main()